@@ -0,0 +1,92 @@
+"""
+Speedup of page-range parallel PDF extraction by page count.
+
+    cd backend
+    PYTHONPATH=src python benchmarks/parallel_extraction.py [--workers 4] [--pages 10 25 50 100 200]
+
+Generates text-heavy PDFs (an audited report, as in notebooks/
+file_genration.ipynb) with fpdf and analyzes each one through
+document_analysis_service.analyze_pdf on a running analysis pool, once as
+a single task and once split in page ranges across all workers. The
+crossover page count is a starting point for PARALLEL_EXTRACTION_MIN_PAGES.
+
+The default of 20 comes from a run with 2 workers (the default pool size)
+on a multi-core host, where 20 pages extracted about 1.2x faster in
+parallel. Measure on a host with at least as many cores as workers: with
+fewer, the ranges only take turns and the numbers are noise.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from fpdf import FPDF
+
+from app.core.config import settings
+from app.core.process_pool import shutdown_process_pool, start_process_pool
+from app.services.document_analysis_service import analyze_pdf
+
+LINES = [
+    "AUDITED FINANCIAL STATEMENTS - ACME FINTECH SOLUTIONS LLC",
+    "Total Assets: 5,400,000   Total Liabilities: 2,100,000",
+    "Revenue: 3,200,000   Net Profit: 640,000   Audit Status: Unqualified",
+    "Note {n}: Receivables are stated at amortised cost less expected credit losses.",
+    "Cash and cash equivalents comprise balances with banks and short-term deposits.",
+    "Property and equipment are measured at cost less accumulated depreciation.",
+]
+
+
+def make_pdf(path: Path, pages: int, lines_per_page: int = 40) -> None:
+    pdf = FPDF()
+    pdf.set_font("Arial", size=9)
+    for page in range(pages):
+        pdf.add_page()
+        for i in range(lines_per_page):
+            pdf.cell(0, 6, txt=LINES[i % len(LINES)].format(n=page * lines_per_page + i), ln=True)
+    pdf.output(str(path))
+
+
+async def timed(path: Path, min_pages: int, repeat: int) -> float:
+    settings.parallel_extraction_min_pages = min_pages
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await analyze_pdf(str(path))
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def run(args) -> None:
+    settings.analysis_pool_workers = args.workers
+    start_process_pool()
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Warm up every worker (imports, language profiles)
+            warm_up = Path(temp_dir) / "warm_up.pdf"
+            make_pdf(warm_up, args.workers)
+            await timed(warm_up, 1, 2)
+
+            print(f"{args.workers} workers, best of {args.repeat}, extractor {settings.pdf_text_extractor}\n")
+            print(f"{'pages':>6}{'single (s)':>14}{'parallel (s)':>15}{'speedup':>10}")
+            for pages in args.pages:
+                path = Path(temp_dir) / f"report_{pages}.pdf"
+                make_pdf(path, pages)
+                single = await timed(path, 0, args.repeat)
+                parallel = await timed(path, 1, args.repeat)
+                print(f"{pages:>6}{single:>14.3f}{parallel:>15.3f}{single / parallel:>9.2f}x")
+    finally:
+        shutdown_process_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 10, 25, 50, 100, 200])
+    parser.add_argument("--repeat", type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
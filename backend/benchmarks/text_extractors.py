@@ -0,0 +1,94 @@
+"""
+Compare the PDF text-extraction backends on the sample corpus.
+
+    cd backend
+    pip install ".[pypdf,pdfminer,pdfium]"    # whichever backends to compare
+    PYTHONPATH=src python benchmarks/text_extractors.py [--repeat 5] [--corpus ../sample_docs]
+
+For every installed backend it reports pages/sec and how its output
+compares with the PyPDF2 baseline:
+- text_similarity: mean difflib ratio of the whitespace-normalised text
+- same_result: documents whose classification and issue/expiry dates match
+The last column is what matters for choosing PDF_TEXT_EXTRACTOR.
+"""
+import argparse
+import difflib
+import time
+from pathlib import Path
+
+from app.services.kyb_pipeline.date_extraction import extract_issue_and_expiry_dates
+from app.services.kyb_pipeline.document_classification_pipeline import DocumentClassificationPipeline
+from app.services.kyb_pipeline.text_extraction import TEXT_EXTRACTORS
+from app.utils.text_compression import join_pages
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+BASELINE = "pypdf2"
+
+
+def normalise(text: str) -> str:
+    return " ".join(text.split())
+
+
+def outcome(pipeline: DocumentClassificationPipeline, text: str):
+    return (
+        pipeline.classify_document(text)["classType"],
+        extract_issue_and_expiry_dates(text, dayfirst=True),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=REPO_ROOT / "sample_docs")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    files = sorted(str(path) for path in args.corpus.rglob("*.pdf"))
+    if not files:
+        raise SystemExit(f"No PDFs found under {args.corpus}")
+
+    pipeline = DocumentClassificationPipeline()
+    texts = {}
+    rows = []
+
+    for name, extractor_class in TEXT_EXTRACTORS.items():
+        if not extractor_class.available():
+            rows.append((name, None, None, None, "not installed"))
+            continue
+
+        extractor = extractor_class()
+        pages = 0
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            texts[name] = []
+            for path in files:
+                page_texts = list(extractor.iter_pages(path))
+                pages += len(page_texts)
+                texts[name].append(join_pages(page_texts))
+        elapsed = time.perf_counter() - started
+        rows.append((name, pages / elapsed, None, None, ""))
+
+    baseline = texts[BASELINE]
+    for i, (name, pages_per_sec, _, _, note) in enumerate(rows):
+        if name not in texts:
+            continue
+        similarity = sum(
+            difflib.SequenceMatcher(None, normalise(a), normalise(b)).ratio()
+            for a, b in zip(baseline, texts[name])
+        ) / len(files)
+        same = sum(
+            outcome(pipeline, a) == outcome(pipeline, b)
+            for a, b in zip(baseline, texts[name])
+        )
+        rows[i] = (name, pages_per_sec, similarity, same, note)
+
+    print(f"{len(files)} PDFs x {args.repeat} runs, baseline {BASELINE}\n")
+    print(f"{'backend':<12}{'pages/sec':>12}{'text_similarity':>18}{'same_result':>14}")
+    for name, pages_per_sec, similarity, same, note in rows:
+        if pages_per_sec is None:
+            print(f"{name:<12}{note:>12}")
+            continue
+        print(f"{name:<12}{pages_per_sec:>12.1f}{similarity:>18.3f}{f'{same}/{len(files)}':>14}")
+
+
+if __name__ == "__main__":
+    main()
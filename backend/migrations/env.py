@@ -6,6 +6,8 @@ from app.db.base import Base
 from app.models.compnay_profile import CompanyProfile 
 from app.models.document import Document 
 from app.models.audit_log import AuditLog 
+from app.models.document_text import DocumentText 
+from app.models.ingestion_job import IngestionJob 
 
 
 from alembic import context
@@ -0,0 +1,30 @@
+"""Document content hash
+
+Revision ID: 4f2c9e7a1d3b
+Revises: ba8a4db7c313
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2c9e7a1d3b'
+down_revision: Union[str, Sequence[str], None] = 'ba8a4db7c313'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_documents_company_id_content_hash', 'documents', ['company_id', 'content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_company_id_content_hash', table_name='documents')
+    op.drop_column('documents', 'content_hash')
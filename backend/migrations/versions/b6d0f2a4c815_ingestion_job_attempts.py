@@ -0,0 +1,30 @@
+"""Ingestion job attempts
+
+Revision ID: b6d0f2a4c815
+Revises: a1c3e5f7b902
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d0f2a4c815'
+down_revision: Union[str, Sequence[str], None] = 'a1c3e5f7b902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ingestion_jobs', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('ingestion_jobs', sa.Column('error', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('ingestion_jobs', 'error')
+    op.drop_column('ingestion_jobs', 'attempts')
@@ -0,0 +1,29 @@
+"""Company KYB ledger
+
+Revision ID: e5d81b4a9f02
+Revises: c3a7f0d92e41
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5d81b4a9f02'
+down_revision: Union[str, Sequence[str], None] = 'c3a7f0d92e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('company_profiles', sa.Column('kyb_ledger', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('company_profiles', 'kyb_ledger')
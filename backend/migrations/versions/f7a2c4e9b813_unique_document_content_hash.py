@@ -0,0 +1,53 @@
+"""Unique document content hash
+
+Revision ID: f7a2c4e9b813
+Revises: e5d81b4a9f02
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a2c4e9b813'
+down_revision: Union[str, Sequence[str], None] = 'e5d81b4a9f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Copies stored by racing uploads before the index was unique: the
+    # earliest document of each content keeps its hash, later ones drop it
+    op.execute(
+        """
+        UPDATE documents SET content_hash = NULL
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY company_id, content_hash ORDER BY upload_time, id
+                ) AS position
+                FROM documents
+                WHERE content_hash IS NOT NULL
+            ) ranked
+            WHERE position > 1
+        )
+        """
+    )
+    op.drop_index('ix_documents_company_id_content_hash', table_name='documents')
+    op.create_index(
+        'ix_documents_company_id_content_hash',
+        'documents',
+        ['company_id', 'content_hash'],
+        unique=True,
+        postgresql_where=sa.text('content_hash IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_documents_company_id_content_hash', table_name='documents')
+    op.create_index('ix_documents_company_id_content_hash', 'documents', ['company_id', 'content_hash'], unique=False)
@@ -0,0 +1,108 @@
+"""
+Train the statistical document classifier from the synthetic corpus.
+
+    cd backend
+    pip install ".[ml]"
+    PYTHONPATH=src python scripts/train_document_classifier.py
+
+Reads the PDFs generated by notebooks/file_genration.ipynb under
+sample_docs/, augments every document with deterministic variants (lines
+dropped and shuffled, title removed, stray lines from other document types
+mixed in) and writes the model to
+src/app/services/kyb_pipeline/models/document_classifier.npz.
+"""
+import argparse
+import random
+from pathlib import Path
+
+from app.services.kyb_pipeline.document_classification_pipeline import DocumentClassificationPipeline
+from app.services.kyb_pipeline.statistical_classifier import DEFAULT_MODEL_PATH, StatisticalDocumentClassifier
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+LABELS = {
+    "trade_license": "Trade License",
+    "moa_aoa": "MOA / AOA",
+    "board_resolution": "Board Resolution",
+    "id_john_smith": "ID",
+    "bank_letter": "Bank Letter",
+    "vat_certificate": "VAT / TRN",
+    "balance_sheet": "Balance Sheet",
+    "profit_loss": "Profit & Loss",
+}
+
+
+def load_corpus(corpus_dir: Path):
+    pipeline = DocumentClassificationPipeline()
+    documents = {}
+    for pdf in sorted(corpus_dir.rglob("*.pdf")):
+        label = LABELS.get(pdf.stem)
+        if label is None:
+            continue
+        text = pipeline.extract_text(str(pdf))
+        documents.setdefault(label, set()).add(text)
+    return {label: sorted(texts) for label, texts in documents.items()}
+
+
+def augment(documents, variants: int, seed: int):
+    rng = random.Random(seed)
+    all_lines = [
+        (label, line)
+        for label, texts in documents.items()
+        for text in texts
+        for line in text.splitlines()
+        if line.strip()
+    ]
+
+    texts, labels = [], []
+    for label, originals in documents.items():
+        for original in originals:
+            texts.append(original)
+            labels.append(label)
+
+            lines = [line for line in original.splitlines() if line.strip()]
+            for _ in range(variants):
+                kept = [line for line in lines if rng.random() < 0.7] or lines[:1]
+                if rng.random() < 0.3:
+                    kept = kept[1:] or kept  # no title line
+                if rng.random() < 0.5:
+                    rng.shuffle(kept)
+                # Passing mentions of other document types ("... with Future Bank")
+                for _ in range(rng.randint(0, 2)):
+                    other_label, line = rng.choice(all_lines)
+                    if other_label != label:
+                        kept.insert(rng.randrange(len(kept) + 1), line)
+                texts.append("\n".join(kept))
+                labels.append(label)
+    return texts, labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=REPO_ROOT / "sample_docs")
+    parser.add_argument("--output", type=Path, default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--variants", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    documents = load_corpus(args.corpus)
+    if not documents:
+        raise SystemExit(f"No labelled PDFs found under {args.corpus}")
+
+    texts, labels = augment(documents, args.variants, args.seed)
+    classifier = StatisticalDocumentClassifier.train(texts, labels)
+
+    predictions = classifier.classify_many(texts)
+    accuracy = sum(p["classType"] == label for p, label in zip(predictions, labels)) / len(labels)
+    print(f"Trained on {len(texts)} texts, {len(documents)} classes, training accuracy {accuracy:.3f}")
+
+    for label, originals in documents.items():
+        for original, prediction in zip(originals, classifier.classify_many(originals)):
+            print(f"  {label:<18} -> {prediction['classType']:<18} {prediction['confidence']:.2f}")
+
+    classifier.save(args.output)
+    print(f"Model written to {args.output} ({args.output.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
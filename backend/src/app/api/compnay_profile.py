@@ -1,11 +1,15 @@
+import json
 from typing import List
 
 from fastapi import APIRouter, Body, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.db_dependencies import get_db
 from app.core.auth_dependencies import get_current_user
+from app.core.blob_dependencies import get_blob_service
  
 from app.core.logging import get_logger
+from app.services.azure.azure_blob_service import AsyncAzureBlobService
 from app.schemas.compnay_profile_schema import CompanyProfileCreate, CompanyProfileRead
 from app.services.db.company_profile_service import CompanyProfileService
 from app.services.kyb_generation_service import KYBGenerationService
@@ -80,6 +84,7 @@ async def get_all_companies(
 async def generate_company_kyb(
     company_id: str,
     db: AsyncSession = Depends(get_db),
+    blob_service: AsyncAzureBlobService = Depends(get_blob_service),
     current_user=Depends(get_current_user),
 ):
     """
@@ -95,7 +100,7 @@ async def generate_company_kyb(
         )
  
         # Run KYB process
-        result =await kyb_service.process(db=db,company_id=company_id)
+        result =await kyb_service.process(db=db,company_id=company_id,blob_service=blob_service)
 
         return {
             "status": "success",
@@ -115,6 +120,29 @@ async def generate_company_kyb(
         )
         raise HTTPException(status_code=500, detail="Failed to generate KYB")
     
+@router.post("/{company_id}/generate-kyb/stream")
+async def stream_company_kyb(
+    company_id: str,
+    blob_service: AsyncAzureBlobService = Depends(get_blob_service),
+    current_user=Depends(get_current_user),
+):
+    """
+    Generate KYB report for a company, streamed as NDJSON progress events.
+    The last event ("result") carries what generate-kyb returns as kyb_result.
+    """
+    logger.info(
+        "User %s (ID: %s) requested streamed KYB generation for company_id=%s",
+        current_user.username,
+        current_user.user_id,
+        company_id,
+    )
+
+    async def _ndjson():
+        async for event in kyb_service.process_events(company_id=company_id, blob_service=blob_service):
+            yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+
 @router.post("/{company_id}/save_profile")
 async def save_profile( 
     payload: dict = Body(...),
@@ -141,6 +169,8 @@ async def save_profile(
             manual_edits=manual_edits,
             actor=current_user.username,
         )
+        # The next generate-kyb runs again instead of returning the cached result
+        kyb_service.invalidate(company_id)
 
         return {"status": "success", "company_id": company_id, "updated_data": updated_data}
 
@@ -160,6 +190,7 @@ async def save_profile(
 async def delete_company(
     company_id: str,
     db: AsyncSession = Depends(get_db),
+    blob_service: AsyncAzureBlobService = Depends(get_blob_service),
     current_user=Depends(get_current_user),
 ):
     """
@@ -172,7 +203,8 @@ async def delete_company(
             raise HTTPException(status_code=404, detail="Company not found")
 
         # Delete company
-        await service.delete_company(db=db, company_id=company_id)
+        await service.delete_company(db=db, company_id=company_id, blob_service=blob_service)
+        kyb_service.invalidate(company_id)
 
         logger.info(
             "User %s (ID: %s) deleted company_id=%s",
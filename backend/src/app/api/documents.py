@@ -5,9 +5,14 @@ from sqlalchemy import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID as pyUUID
 from app.core.db_dependencies import get_db
+from app.core.blob_dependencies import get_blob_service
+from app.core.ingestion_job_dependencies import get_ingestion_job_runner
 from app.models.document import  Document, GetDocument, MultiUploadResponse, UploadedDocument 
+from app.services.azure.azure_blob_service import AsyncAzureBlobService
 from app.services.db.document_service import DocumentService
-from app.services.file_upload import save_multiple_files
+from app.schemas.ingestion_job_schema import IngestionJobAccepted, IngestionJobRead
+from app.services.file_upload import UploadTooLargeError, save_multiple_files
+from app.services.ingestion_job_service import IngestionJobRunner
 from app.core.logging import get_logger
 from app.core.auth_dependencies import get_current_user 
 logger = get_logger(__name__)
@@ -20,6 +25,7 @@ async def upload_documents(
     company_id: str = Form(...),
     files: List[UploadFile] = File(...),
     db: AsyncSession = Depends(get_db),
+    blob_service: AsyncAzureBlobService = Depends(get_blob_service),
     current_user=Depends(get_current_user),
 ):
     if not files:
@@ -39,6 +45,7 @@ async def upload_documents(
             company_id=company_id,
             db=db,
             uploader=current_user.username,
+            blob_service=blob_service,
         )
 
         return MultiUploadResponse(
@@ -46,6 +53,15 @@ async def upload_documents(
             uploaded=results,
         )
 
+    except UploadTooLargeError as e:
+        logger.warning(
+            "Upload rejected for user %s (ID: %s): %s",
+            current_user.username,
+            current_user.user_id,
+            e,
+        )
+        raise HTTPException(status_code=413, detail=str(e))
+
     except Exception:
         logger.exception(
             "File upload failed for user %s (ID: %s)",
@@ -55,6 +71,77 @@ async def upload_documents(
         raise HTTPException(status_code=500, detail="Upload failed")
     
 
+@router.post("/jobs", response_model=IngestionJobAccepted, status_code=202)
+async def submit_ingestion_job(
+    company_id: str = Form(...),
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_db),
+    job_runner: IngestionJobRunner = Depends(get_ingestion_job_runner),
+    current_user=Depends(get_current_user),
+):
+    """Spool the files and ingest them in the background; poll GET /documents/jobs/{job_id}."""
+    if not files:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+
+    logger.info(
+        "User %s (ID: %s) submitting %d files as ingestion job for session %s",
+        current_user.username,
+        current_user.user_id,
+        len(files),
+        company_id,
+    )
+
+    try:
+        job = await job_runner.submit(
+            db=db,
+            files=files,
+            company_id=company_id,
+            uploader=current_user.username,
+        )
+        return IngestionJobAccepted(job_id=job.id, status=job.status, total=len(job.files))
+
+    except UploadTooLargeError as e:
+        logger.warning(
+            "Upload rejected for user %s (ID: %s): %s",
+            current_user.username,
+            current_user.user_id,
+            e,
+        )
+        raise HTTPException(status_code=413, detail=str(e))
+
+    except Exception:
+        logger.exception(
+            "Ingestion job submission failed for user %s (ID: %s)",
+            current_user.username,
+            current_user.user_id,
+        )
+        raise HTTPException(status_code=500, detail="Upload failed")
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobRead)
+async def get_ingestion_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    job_runner: IngestionJobRunner = Depends(get_ingestion_job_runner),
+    current_user=Depends(get_current_user),
+):
+    job = await job_runner.get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+
+    return IngestionJobRead(
+        id=job.id,
+        company_id=job.company_id,
+        status=job.status,
+        total=len(job.files),
+        processed=sum(1 for f in job.files if f["status"] not in ("queued", "processing")),
+        files=job.files,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
 @router.get("/by-company/{company_id}", response_model=List[GetDocument])
 async def get_documents_by_company(
     company_id: str,
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends
 from app.core.logging import get_logger
 from app.core.auth_dependencies import get_current_user
+from app.services.kyb_pipeline.analysis_cache import get_analysis_cache
 
 logger = get_logger(__name__)
 
@@ -9,4 +10,4 @@ router = APIRouter(prefix="/health", tags=["Health"])
 @router.get("")
 def health_check(current_user = Depends(get_current_user)):
     logger.info(f"Health check accessed by user: {current_user.username} (ID: {current_user.user_id})")
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok", "analysis_cache": get_analysis_cache().stats()}
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""
+kyb-batch: classify and extract a directory tree of PDFs offline.
+
+    kyb-batch sample_docs/ --output-dir out/ --workers 4
+
+Runs the DocumentAnalyzer and the compliance / risk assembly without
+FastAPI, Postgres or Azure. Every PDF is
+processed in a multiprocessing pool; the results are written as NDJSON:
+
+    documents.ndjson   one record per PDF (classification, dates, language,
+                       timings, or the error)
+    companies.ndjson   one unified KYB record per company folder (the
+                       directory that directly contains the PDFs)
+
+With --classify-only each PDF is only classified, reading pages until the
+confidence reaches CLASSIFICATION_EARLY_EXIT_CONFIDENCE (e.g. to sort a
+document dump by type); documents.ndjson then has the class type and the
+pages read, and no companies.ndjson is written.
+
+Throughput statistics are printed to stderr at the end. Settings are read
+from the environment / .env as for the app.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Database and blob storage are never touched here, but Settings requires them
+for _name in (
+    "SECRET_KEY",
+    "ALGORITHM",
+    "DATABASE_URL",
+    "DATABASE_URL_ASYNC",
+    "AZURE_STORAGE_BLOB_CONNECTION_STRING",
+    "AZURE_STORAGE_CONTAINER",
+):
+    os.environ.setdefault(_name, "unused-by-kyb-batch")
+
+
+def find_pdfs(root: Path) -> List[Path]:
+    return sorted(path for path in root.rglob("*") if path.is_file() and path.suffix.lower() == ".pdf")
+
+
+def _init_worker() -> None:
+    from app.core.logging import setup_logging
+    from app.utils.language import warm_up_language_profiles
+
+    setup_logging()
+    warm_up_language_profiles()
+
+
+def process_pdf(path: str) -> Dict:
+    """Classify and extract one PDF in a single pass (runs in a pool worker)."""
+    from app.services.kyb_pipeline.document_analyzer import DocumentAnalyzer, stamp_processed_at
+    from app.utils.paged_text import PagedText
+
+    started = time.perf_counter()
+    file_name = os.path.basename(path)
+
+    try:
+        analyzer = DocumentAnalyzer()
+        doc = PagedText(analyzer.classification.iter_pages(path))
+        result = analyzer.analyze(doc, file_name)
+    except Exception as e:
+        return {
+            "path": path,
+            "fileName": file_name,
+            "status": "failed",
+            "error": f"{type(e).__name__}: {e}",
+            "seconds": round(time.perf_counter() - started, 4),
+        }
+
+    return {
+        "path": path,
+        "fileName": file_name,
+        "status": "processed",
+        "classType": result["classType"],
+        "confidence": result["confidence"],
+        "issueDate": result["issueDate"],
+        "expiryDate": result["expiryDate"],
+        "language": result["language"],
+        "pageCount": result["pageCount"],
+        "seconds": round(time.perf_counter() - started, 4),
+        "partial": stamp_processed_at(result["kyb"], datetime.utcnow().isoformat()),
+    }
+
+
+def classify_pdf(path: str) -> Dict:
+    """Class type only, from as few pages as needed (runs in a pool worker)."""
+    from app.services.kyb_pipeline.document_classification_pipeline import classify_document_file
+
+    started = time.perf_counter()
+    file_name = os.path.basename(path)
+
+    try:
+        result = classify_document_file(path)
+    except Exception as e:
+        return {
+            "path": path,
+            "fileName": file_name,
+            "status": "failed",
+            "error": f"{type(e).__name__}: {e}",
+            "seconds": round(time.perf_counter() - started, 4),
+        }
+
+    return {
+        "path": path,
+        "fileName": file_name,
+        "status": "processed",
+        "classType": result["classType"],
+        "confidence": result["confidence"],
+        "pagesRead": result["pagesRead"],
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+def build_company_records(root: Path, results: Dict[str, Dict]) -> List[Dict]:
+    """Merge the per-document partials of every company folder, in path order."""
+    from app.services.kyb_pipeline.kyb_assembly import assemble_kyb_record
+    from app.services.kyb_pipeline.kyb_extraction_piepline import reduce_partials
+
+    folders: Dict[Path, List[Dict]] = defaultdict(list)
+    for path in sorted(results):
+        folders[Path(path).parent].append(results[path])
+
+    records = []
+    for folder in sorted(folders):
+        company = str(folder.relative_to(root)) if folder != root else root.name
+        unified = reduce_partials(
+            result["partial"] for result in folders[folder] if result["status"] == "processed"
+        )
+
+        records.append({
+            "company": company,
+            "folder": str(folder),
+            "documents": len(folders[folder]),
+            "failed": sum(1 for result in folders[folder] if result["status"] == "failed"),
+            "unified_company": assemble_kyb_record(unified, company),
+        })
+    return records
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="kyb-batch",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("directory", type=Path, help="root directory scanned recursively for PDFs")
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("kyb_batch_output"))
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--classify-only",
+        action="store_true",
+        help="only classify, stopping at CLASSIFICATION_EARLY_EXIT_CONFIDENCE; no company records",
+    )
+    parser.add_argument("--log-level", default="WARNING", help="app log level inside the batch (default WARNING)")
+    args = parser.parse_args(argv)
+
+    # Must be set before app.core.config is imported (here and in the workers)
+    os.environ["LOG_LEVEL"] = args.log_level
+    os.environ.setdefault("LOG_TO_FILE", "false")
+
+    root = args.directory.resolve()
+    if not root.is_dir():
+        parser.error(f"{args.directory} is not a directory")
+
+    files = find_pdfs(root)
+    if not files:
+        print(f"No PDFs found under {root}", file=sys.stderr)
+        return 1
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    documents_path = args.output_dir / "documents.ndjson"
+    companies_path = args.output_dir / "companies.ndjson"
+    workers = max(1, min(args.workers, len(files)))
+
+    started = time.perf_counter()
+    results: Dict[str, Dict] = {}
+
+    with documents_path.open("w", encoding="utf-8") as documents_out:
+        with multiprocessing.get_context("spawn").Pool(workers, initializer=_init_worker) as pool:
+            # Records are written as they complete; "path" identifies each one
+            worker = classify_pdf if args.classify_only else process_pdf
+            for result in pool.imap_unordered(worker, [str(path) for path in files]):
+                results[result["path"]] = result
+                record = {key: value for key, value in result.items() if key != "partial"}
+                documents_out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    documents_elapsed = time.perf_counter() - started
+
+    company_records = []
+    if not args.classify_only:
+        _init_worker()  # the company assembly below logs from this process
+        company_records = build_company_records(root, results)
+        with companies_path.open("w", encoding="utf-8") as companies_out:
+            for record in company_records:
+                companies_out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    elapsed = time.perf_counter() - started
+    processed = [result for result in results.values() if result["status"] == "processed"]
+    pages = sum(result["pagesRead" if args.classify_only else "pageCount"] for result in processed)
+    megabytes = sum(path.stat().st_size for path in files) / (1024 * 1024)
+
+    print(
+        f"kyb-batch: {len(files)} documents ({len(files) - len(processed)} failed), {pages} pages, "
+        f"{megabytes:.1f} MiB, {len(company_records)} companies, {workers} workers\n"
+        f"  documents: {documents_elapsed:.2f}s  "
+        f"{len(files) / documents_elapsed:.1f} docs/s  {pages / documents_elapsed:.1f} pages/s  "
+        f"{megabytes / documents_elapsed:.2f} MiB/s\n"
+        f"  total:     {elapsed:.2f}s\n"
+        f"  output:    {documents_path}" + ("" if args.classify_only else f", {companies_path}"),
+        file=sys.stderr,
+    )
+    return 0 if len(processed) == len(files) else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
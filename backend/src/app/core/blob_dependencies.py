@@ -0,0 +1,7 @@
+from fastapi import Request
+from app.services.azure.azure_blob_service import AsyncAzureBlobService
+
+
+def get_blob_service(request: Request) -> AsyncAzureBlobService:
+    """Shared blob client created in the app lifespan."""
+    return request.app.state.blob_service
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -12,6 +13,49 @@ class Settings(BaseSettings):
     log_file_path: str = "logs/app.log"
     temp_file_path: str = "temp"
 
+    # Uploads
+    upload_chunk_size: int = 1024 * 1024  # 1 MiB
+    max_upload_file_size: int = 25 * 1024 * 1024  # 25 MiB per file
+    max_upload_batch_size: int = 200 * 1024 * 1024  # 200 MiB per request
+
+    # Ingestion
+    ingestion_concurrency: int = 4  # files ingested in parallel per upload batch
+
+    # Background ingestion jobs (POST /documents/jobs)
+    ingestion_job_spool_path: str = "temp/jobs"  # must survive restarts
+    ingestion_job_workers: int = 2  # jobs processed at the same time per app process
+    ingestion_job_lease_seconds: int = 600  # running job without progress for this long is re-claimed
+    ingestion_job_sweep_seconds: int = 60  # how often idle workers look for orphaned jobs
+    ingestion_job_max_attempts: int = 3  # a job crashing (or abandoned) this often is marked failed
+
+    # Document analysis process pool (PDF parsing, classification, extraction)
+    analysis_pool_workers: int = 2
+    analysis_pool_max_queue: int = 32  # queued + running tasks before callers wait
+
+    # PDF text extraction: pypdf2 | pypdf | pdfminer | pypdfium2 (see benchmarks/text_extractors.py)
+    pdf_text_extractor: str = "pypdf2"
+    # PDFs with at least this many pages are extracted in page ranges on all
+    # pool workers at once, 0 disables it. About 1.2x at 20 pages with 2 workers
+    # on a multi-core host; rerun benchmarks/parallel_extraction.py for other pool sizes
+    parallel_extraction_min_pages: int = 20
+
+    # Classification
+    classification_early_exit_confidence: float = 0.9  # page-lazy classification stops once reached
+    document_classifier: str = "keywords"  # keywords | statistical (needs the "ml" extra)
+    document_classifier_model_path: Optional[str] = None  # defaults to the bundled .npz
+    language_detection_sample_chars: int = 2000  # language is detected on a sample this long
+
+    # Analysis result cache, keyed by content hash + pipeline version
+    analysis_cache_memory_bytes: int = 64 * 1024 * 1024  # in-process LRU tier, 0 disables it
+    analysis_cache_path: str = "temp/analysis_cache"  # local disk tier, empty disables it
+    analysis_cache_disk_bytes: int = 1024 * 1024 * 1024
+    # Disk entries of other pipeline versions are removed once unused this long
+    analysis_cache_stale_version_seconds: int = 7 * 24 * 3600
+
+    # Generated KYB results kept in memory (one per company) until the company's
+    # document set changes or it is edited manually, 0 disables it
+    kyb_result_cache_entries: int = 256
+
     # Security / secrets
     secret_key: str
     algorithm: str
@@ -19,6 +63,9 @@ class Settings(BaseSettings):
     # Azure storage
     azure_storage_blob_connection_string: str
     azure_storage_container: str
+    azure_storage_create_container: bool = False  # e.g. for a fresh Azurite emulator
+    azure_blob_max_connections: int = 32  # shared HTTP connection pool size
+    azure_blob_transfer_concurrency: int = 4  # parallel block transfers per blob
 
     # Database URLs
     database_url: str
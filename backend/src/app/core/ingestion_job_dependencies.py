@@ -0,0 +1,7 @@
+from fastapi import Request
+from app.services.ingestion_job_service import IngestionJobRunner
+
+
+def get_ingestion_job_runner(request: Request) -> IngestionJobRunner:
+    """Background ingestion job runner started in the app lifespan."""
+    return request.app.state.ingestion_jobs
@@ -1,6 +1,6 @@
 import logging
 import json
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from datetime import datetime
 from app.core.config import settings
@@ -155,5 +155,23 @@ def setup_logging() -> None:
     )
 
 
+def setup_worker_logging(queue) -> None:
+    """
+    Logging for a process pool worker: records are put on `queue` and
+    written by the parent's handlers (see start_worker_log_listener), so
+    only one process ever writes to and rolls over the log files.
+    """
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(queue)]
+    root.setLevel(getattr(logging, settings.log_level.upper(), logging.INFO))
+
+
+def start_worker_log_listener(queue) -> QueueListener:
+    """Write records sent by setup_worker_logging through this process's handlers."""
+    listener = QueueListener(queue, *logging.getLogger().handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
 def get_logger(name: str) -> logging.Logger:
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
@@ -0,0 +1,131 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from logging.handlers import QueueListener
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger, setup_worker_logging, start_worker_log_listener
+from app.utils.language import warm_up_language_profiles
+
+logger = get_logger(__name__)
+
+# Owned by the FastAPI lifespan (see app.main)
+_executor: Optional[ProcessPoolExecutor] = None
+_queue_slots: Optional[asyncio.Semaphore] = None
+_restart_lock: Optional[asyncio.Lock] = None
+_workers = 0
+_log_queue: Optional[multiprocessing.Queue] = None
+_log_listener: Optional[QueueListener] = None
+
+
+def _init_worker(log_queue: multiprocessing.Queue) -> None:
+    """Runs once in every worker process."""
+    setup_worker_logging(log_queue)
+    warm_up_language_profiles()
+
+
+def _new_executor(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(_log_queue,),
+    )
+
+
+def start_process_pool() -> None:
+    """Create the shared process pool used for CPU-bound document analysis."""
+    global _executor, _queue_slots, _restart_lock, _workers, _log_queue, _log_listener
+
+    if _executor is not None:
+        return
+
+    # Workers log through the parent, which alone owns the log files
+    _log_queue = multiprocessing.get_context("spawn").Queue()
+    _log_listener = start_worker_log_listener(_log_queue)
+
+    workers = max(1, settings.analysis_pool_workers)
+    _workers = workers
+    _executor = _new_executor(workers)
+    _queue_slots = asyncio.Semaphore(max(workers, settings.analysis_pool_max_queue))
+    _restart_lock = asyncio.Lock()
+
+    logger.info(
+        "Analysis process pool started (workers=%d, max_queue=%d)",
+        workers,
+        max(workers, settings.analysis_pool_max_queue),
+    )
+
+
+def shutdown_process_pool() -> None:
+    """Stop the process pool, cancelling work that has not started yet."""
+    global _executor, _queue_slots, _restart_lock, _workers, _log_queue, _log_listener
+
+    if _executor is None:
+        return
+
+    _executor.shutdown(wait=True, cancel_futures=True)
+    _executor = None
+    _queue_slots = None
+    _restart_lock = None
+    _workers = 0
+
+    _log_listener.stop()  # writes what the workers logged last
+    _log_queue.close()
+    _log_listener = None
+    _log_queue = None
+    logger.info("Analysis process pool stopped")
+
+
+def process_pool_workers() -> int:
+    """Worker processes of the running pool (0 outside the app lifespan)."""
+    return _workers
+
+
+async def _replace_broken_executor(broken: ProcessPoolExecutor) -> None:
+    """Swap a pool that lost a worker for a fresh one (once, however many callers saw it break)."""
+    global _executor
+
+    async with _restart_lock:
+        if _executor is not broken:
+            return  # already replaced by another caller, or shut down
+
+        _executor = _new_executor(_workers)
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    logger.error("Analysis process pool broken (a worker died), restarted it (workers=%d)", _workers)
+
+
+async def run_in_process_pool(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a picklable, module-level function in the analysis process pool.
+
+    At most `analysis_pool_max_queue` calls are queued or running at once;
+    further callers wait for a slot instead of piling work onto the pool.
+    Outside the app lifespan (scripts, shells) the call falls back to a
+    thread so the event loop is still never blocked.
+
+    A worker that dies (OOM kill, crash in a native PDF backend) breaks the
+    whole pool; it is then replaced and the call retried once, so only a
+    document that kills its worker twice fails.
+    """
+    call = partial(fn, *args, **kwargs)
+
+    if _executor is None:
+        return await asyncio.to_thread(call)
+
+    async with _queue_slots:
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = _executor
+            if executor is None:
+                return await asyncio.to_thread(call)  # pool shut down meanwhile
+            try:
+                return await loop.run_in_executor(executor, call)
+            except BrokenProcessPool:
+                await _replace_broken_executor(executor)
+                if attempt:
+                    raise
@@ -2,6 +2,10 @@ from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from app.core.logging import setup_logging,get_logger
 from app.core.config import settings
+from app.core.process_pool import start_process_pool, shutdown_process_pool
+from app.services.azure.azure_blob_service import AsyncAzureBlobService
+from app.services.ingestion_job_service import IngestionJobRunner
+from app.utils.language import warm_up_language_profiles
  
 
 setup_logging() 
@@ -11,11 +15,20 @@ logger = get_logger(__name__)
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting application...")
+    warm_up_language_profiles()  # also used by the thread fallback of the process pool
+    start_process_pool()
+    app.state.blob_service = AsyncAzureBlobService()
+    await app.state.blob_service.start()
+    app.state.ingestion_jobs = IngestionJobRunner(app.state.blob_service)
+    await app.state.ingestion_jobs.start()
 
     yield  # app is now running
     
     # Shutdown
     logger.info("Application shutting down")
+    await app.state.ingestion_jobs.stop()
+    await app.state.blob_service.close()
+    shutdown_process_pool()
 
 # Pass lifespan to FastAPI
 app = FastAPI(
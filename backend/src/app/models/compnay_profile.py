@@ -12,4 +12,6 @@ class CompanyProfile(Base):
     status = Column(String, default="active")
 
  
-    kyb_data = Column(JSONB, nullable=True)
\ No newline at end of file
+    kyb_data = Column(JSONB, nullable=True)
+    # Per-document KYB partials of the last generation, see KYBGenerationService
+    kyb_ledger = Column(JSONB, nullable=True)
@@ -2,7 +2,7 @@ from datetime import date
 
 from pydantic import BaseModel
 from typing import List, Optional
-from sqlalchemy import UUID, Column, Date, Float, ForeignKey, String, DateTime
+from sqlalchemy import UUID, Column, Date, Float, ForeignKey, Index, String, DateTime
 from sqlalchemy.sql import func
 from app.db.base import Base
 
@@ -11,6 +11,7 @@ class UploadedDocument(BaseModel):
     document_id: str
     filename: str
     status: str
+    deduplicated: bool = False  # same content already uploaded for this company
 class GetDocument(BaseModel):
     id: str         
     filename:str  
@@ -45,8 +46,21 @@ class Document(Base):
     expiry_date = Column(Date, nullable=True)
     language = Column(String, nullable=True)
     confidence = Column(Float, nullable=True)
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of the file bytes
     # link to company
     company_id = Column(UUID(as_uuid=True), ForeignKey("company_profiles.company_id"), nullable=False)
 
+    __table_args__ = (
+        # One document per content and company; concurrent uploads of the same
+        # bytes resolve to the row that won (see persist_document_rows)
+        Index(
+            "ix_documents_company_id_content_hash",
+            "company_id",
+            "content_hash",
+            unique=True,
+            postgresql_where=content_hash.isnot(None),
+        ),
+    )
+
 
  
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class DocumentText(Base):
+    """Per-page text extracted at ingest, stored compressed (see app.utils.text_compression)."""
+
+    __tablename__ = "document_texts"
+
+    document_id = Column(String, ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    encoding = Column(String, nullable=False)
+    page_count = Column(Integer, nullable=False)
+    pages = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class IngestionJob(Base):
+    """A spooled upload batch processed in the background (see IngestionJobRunner)."""
+
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(String, primary_key=True, index=True)
+    company_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("company_profiles.company_id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    uploader = Column(String, nullable=False)
+
+    status = Column(String, nullable=False, default="queued")
+    # queued | running | completed | failed
+    lease_owner = Column(String, nullable=True)  # claim token of the worker holding a running job
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")  # claims so far
+    error = Column(String, nullable=True)  # last crash of the job, if any
+
+    # One entry per file: filename, spool_path, content_hash, size, status,
+    # document_id, deduplicated, error
+    files = Column(JSONB, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,13 +1,15 @@
+import asyncio
 from app.models.document import Document 
 from sqlalchemy.ext.asyncio import AsyncSession 
 from uuid import uuid4
 from sqlalchemy import select, delete
 from app.models.compnay_profile import CompanyProfile
-from app.services.azure.azure_blob_service import AzureBlobService
+from app.services.azure.azure_blob_service import AsyncAzureBlobService
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
 
 class CompanyProfileRepository:
-    def __init__(self):
-        self.blob_service = AzureBlobService()
 
     async def create(self, db: AsyncSession, data: dict):
         obj = CompanyProfile(
@@ -62,7 +64,34 @@ class CompanyProfileRepository:
 
         return company
       
-    async def delete(self, db: AsyncSession, company_id: str) -> bool:
+    async def update_kyb_ledger(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        kyb_ledger: dict
+    ) -> CompanyProfile | None:
+        """
+        Overwrite the KYB ledger (per-document contributions of the last
+        generation); kyb_data is left untouched.
+        """
+        result = await db.execute(
+            select(CompanyProfile).where(
+                CompanyProfile.company_id == company_id
+            )
+        )
+        company = result.scalars().first()
+
+        if not company:
+            return None
+
+        company.kyb_ledger = kyb_ledger
+
+        await db.commit()
+        await db.refresh(company)
+
+        return company
+
+    async def delete(self, db: AsyncSession, company_id: str, blob_service: AsyncAzureBlobService) -> bool:
         """
         Delete a company profile by its ID.
         Deletes all related documents and their blobs first to avoid FK violation.
@@ -81,14 +110,16 @@ class CompanyProfileRepository:
         )
         documents = result.scalars().all()
 
-        # 3️⃣ Delete blobs from Azure for each document
-        for doc in documents:
-            if doc.blob_path:  # <-- correct attribute
-                try:
-                    self.blob_service.delete_file(doc.blob_path)
-                except Exception as e:
-                    # Log the error but continue deleting
-                    print(f"Failed to delete blob {doc.blob_path}: {e}")
+        # 3️⃣ Delete blobs from Azure for each document (concurrently)
+        blob_paths = [doc.blob_path for doc in documents if doc.blob_path]
+        delete_results = await asyncio.gather(
+            *(blob_service.delete_file(blob_path) for blob_path in blob_paths),
+            return_exceptions=True,
+        )
+        for blob_path, outcome in zip(blob_paths, delete_results):
+            if isinstance(outcome, Exception):
+                # Log the error but continue deleting
+                logger.warning("Failed to delete blob %s: %s", blob_path, outcome)
 
         # 4️⃣ Delete document rows from the DB
         await db.execute(delete(Document).where(Document.company_id == company_id))
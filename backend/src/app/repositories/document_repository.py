@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from app.models.document import Document
 from uuid import uuid4
 from typing import List
@@ -18,6 +18,43 @@ class DocumentRepository:
         return obj
     
 
+    async def bulk_create(self, db: AsyncSession, data_list: List[dict], commit: bool = True) -> List[Document]:
+        """
+        Insert many documents with one INSERT ... RETURNING and a single commit.
+        Rows come back in the order of `data_list`. With commit=False the
+        caller owns the transaction.
+        """
+        if not data_list:
+            return []
+
+        rows = [{"id": str(uuid4()), **data} for data in data_list]
+        result = await db.scalars(
+            insert(Document).returning(Document, sort_by_parameter_order=True),
+            rows,
+        )
+        documents = result.all()
+        if commit:
+            await db.commit()
+        return documents
+
+    async def get_by_content_hashes(
+        self, db: AsyncSession, company_id: str, content_hashes: List[str]
+    ) -> List[Document]:
+        """
+        Fetch a company's documents whose content hash is in `content_hashes`
+        (served by the (company_id, content_hash) index).
+        """
+        if not content_hashes:
+            return []
+
+        result = await db.execute(
+            select(Document)
+            .where(Document.company_id == company_id)
+            .where(Document.content_hash.in_(content_hashes))
+            .order_by(Document.upload_time)
+        )
+        return result.scalars().all()
+
     async def get_by_company_id(self, db: AsyncSession, company_id: str) -> List[Document]:
         """
         Fetch all documents associated with a given company_id
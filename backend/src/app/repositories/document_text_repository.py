@@ -0,0 +1,32 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, select
+from app.models.document_text import DocumentText
+from typing import List
+
+
+class DocumentTextRepository:
+
+    async def bulk_create(self, db: AsyncSession, data_list: List[dict], commit: bool = True) -> None:
+        """
+        Insert stored texts for many documents in one statement.
+        With commit=False the caller owns the transaction.
+        """
+        if not data_list:
+            return
+
+        await db.execute(insert(DocumentText), data_list)
+        if commit:
+            await db.commit()
+
+    async def get_by_document_ids(self, db: AsyncSession, document_ids: List[str]) -> List[DocumentText]:
+        """
+        Fetch stored texts for the given documents (documents ingested before
+        texts were stored simply have no row).
+        """
+        if not document_ids:
+            return []
+
+        result = await db.execute(
+            select(DocumentText).where(DocumentText.document_id.in_(document_ids))
+        )
+        return result.scalars().all()
@@ -0,0 +1,135 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.sql import func
+from app.models.ingestion_job import IngestionJob
+from datetime import datetime
+from typing import List, Optional
+
+
+class IngestionJobRepository:
+
+    async def create(self, db: AsyncSession, data: dict) -> IngestionJob:
+        obj = IngestionJob(**data)
+        db.add(obj)
+        await db.commit()
+        await db.refresh(obj)
+        return obj
+
+    async def get_by_id(self, db: AsyncSession, job_id: str) -> Optional[IngestionJob]:
+        result = await db.execute(
+            select(IngestionJob)
+            .where(IngestionJob.id == job_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
+
+    def _claimable(self, stale_before: datetime):
+        """Queued jobs, and running jobs whose worker stopped reporting progress."""
+        return or_(
+            IngestionJob.status == "queued",
+            and_(IngestionJob.status == "running", IngestionJob.updated_at < stale_before),
+        )
+
+    async def get_claimable_ids(self, db: AsyncSession, stale_before: datetime) -> List[str]:
+        result = await db.execute(
+            select(IngestionJob.id)
+            .where(self._claimable(stale_before))
+            .order_by(IngestionJob.created_at)
+        )
+        return list(result.scalars().all())
+
+    async def claim(
+        self, db: AsyncSession, job_id: str, stale_before: datetime, owner: str
+    ) -> Optional[IngestionJob]:
+        """
+        Atomically mark a claimable job as running, leased to `owner`. Returns
+        None when another worker (possibly in another process) already holds it.
+        """
+        result = await db.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id == job_id)
+            .where(self._claimable(stale_before))
+            .values(
+                status="running",
+                lease_owner=owner,
+                attempts=IngestionJob.attempts + 1,
+                updated_at=func.now(),
+            )
+            .returning(IngestionJob.id)
+        )
+        claimed = result.first() is not None
+        await db.commit()
+        if not claimed:
+            return None
+        return await self.get_by_id(db, job_id)
+
+    def _held_by(self, job_id: str, owner: str):
+        return and_(
+            IngestionJob.id == job_id,
+            IngestionJob.status == "running",
+            IngestionJob.lease_owner == owner,
+        )
+
+    async def renew_lease(self, db: AsyncSession, job_id: str, owner: str) -> bool:
+        """Refresh the lease; False when the job is no longer held by `owner`."""
+        result = await db.execute(
+            update(IngestionJob)
+            .where(self._held_by(job_id, owner))
+            .values(updated_at=func.now())
+            .returning(IngestionJob.id)
+        )
+        held = result.first() is not None
+        await db.commit()
+        return held
+
+    async def update_progress(
+        self, db: AsyncSession, job_id: str, owner: str, files: List[dict], status: str = "running"
+    ) -> bool:
+        """
+        Store per-file progress (also refreshes the lease). Ignored, returning
+        False, when the job is no longer held by `owner`.
+        """
+        result = await db.execute(
+            update(IngestionJob)
+            .where(self._held_by(job_id, owner))
+            .values(files=files, status=status, updated_at=func.now())
+            .returning(IngestionJob.id)
+        )
+        held = result.first() is not None
+        await db.commit()
+        return held
+
+    async def release(
+        self,
+        db: AsyncSession,
+        job_id: str,
+        owner: str,
+        files: Optional[List[dict]] = None,
+        status: str = "queued",
+        error: Optional[str] = None,
+        requeue_without_attempt: bool = False,
+    ) -> bool:
+        """
+        Hand a crashed job back ("queued") or give up on it ("failed"),
+        recording the error; `files` stays as stored when None. With
+        requeue_without_attempt (an interrupted, not crashed, job) it is queued
+        and the attempt its claim spent is given back. False when the job is
+        no longer held by `owner`.
+        """
+        values = {"status": status, "lease_owner": None, "updated_at": func.now()}
+        if files is not None:
+            values["files"] = files
+        if error is not None:
+            values["error"] = error
+        if requeue_without_attempt:
+            values.update(status="queued", attempts=IngestionJob.attempts - 1)
+
+        result = await db.execute(
+            update(IngestionJob)
+            .where(self._held_by(job_id, owner))
+            .values(**values)
+            .returning(IngestionJob.id)
+        )
+        held = result.first() is not None
+        await db.commit()
+        return held
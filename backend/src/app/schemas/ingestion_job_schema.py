@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+import uuid
+
+
+class IngestionJobAccepted(BaseModel):
+    job_id: str
+    status: str
+    total: int
+
+
+class IngestionJobFile(BaseModel):
+    filename: str
+    status: str  # queued | processing | uploaded | failed
+    document_id: Optional[str] = None
+    deduplicated: bool = False
+    error: Optional[str] = None
+
+
+class IngestionJobRead(BaseModel):
+    id: str
+    company_id: uuid.UUID
+    status: str
+    total: int
+    processed: int
+    files: List[IngestionJobFile]
+    error: Optional[str] = None  # why the job failed (or last crashed)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -1,31 +1,69 @@
-from azure.storage.blob import BlobServiceClient, ContentSettings
+from azure.storage.blob import ContentSettings
+from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient
+from azure.core.exceptions import ResourceExistsError
+from azure.core.pipeline.transport import AioHttpTransport
 from uuid import uuid4
 from datetime import datetime
 from app.core.config import settings
+import aiohttp
 import os
 
-class AzureBlobService:
+class AsyncAzureBlobService:
+    """
+    Non-blocking blob storage client built on azure.storage.blob.aio.
+
+    One instance is created per process by the FastAPI lifespan and shared by
+    every request through `get_blob_service`, so all blob traffic goes through
+    a single aiohttp connection pool. Point the connection string at Azurite
+    (with AZURE_STORAGE_CREATE_CONTAINER=true) to run against the emulator.
+    """
+
     def __init__(self):
         self.connection_string = settings.azure_storage_blob_connection_string
         self.container_name = settings.azure_storage_container
 
-        self.blob_service_client = BlobServiceClient.from_connection_string(
-            self.connection_string
+        self._http_session = None
+        self.blob_service_client = None
+        self.container_client = None
+
+    async def start(self):
+        """Open the shared HTTP connection pool and blob client."""
+        self._http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=settings.azure_blob_max_connections)
         )
+        transport = AioHttpTransport(session=self._http_session, session_owner=False)
 
+        self.blob_service_client = AsyncBlobServiceClient.from_connection_string(
+            self.connection_string,
+            transport=transport,
+        )
         self.container_client = self.blob_service_client.get_container_client(
             self.container_name
         )
 
-    def upload_file(self, file_path: str, filename: str, content_type: str):
+        if settings.azure_storage_create_container:
+            try:
+                await self.container_client.create_container()
+            except ResourceExistsError:
+                pass
+
+    async def close(self):
+        """Close the blob client and release pooled connections."""
+        if self.blob_service_client is not None:
+            await self.blob_service_client.close()
+        if self._http_session is not None:
+            await self._http_session.close()
+
+    async def upload_file(self, file_path: str, filename: str, content_type: str):
         blob_name = f"{uuid4()}_{filename}"
         blob_client = self.container_client.get_blob_client(blob_name)
 
         with open(file_path, "rb") as data:
-            blob_client.upload_blob(
+            await blob_client.upload_blob(
                 data,
                 overwrite=True,
                 content_settings=ContentSettings(content_type=content_type),
+                max_concurrency=settings.azure_blob_transfer_concurrency,
             )
 
         return {
@@ -33,8 +71,8 @@ class AzureBlobService:
             "blob_url": blob_client.url,
             "uploaded_at": datetime.utcnow(),
         }
-    
-    def download_file(self, blob_name: str, download_path: str):
+
+    async def download_file(self, blob_name: str, download_path: str):
         """
         Download a file from Azure Blob Storage.
 
@@ -46,20 +84,21 @@ class AzureBlobService:
         # Ensure the local directory exists
         os.makedirs(os.path.dirname(download_path), exist_ok=True)
 
+        download_stream = await blob_client.download_blob(
+            max_concurrency=settings.azure_blob_transfer_concurrency
+        )
         with open(download_path, "wb") as f:
-            download_stream = blob_client.download_blob()
-            f.write(download_stream.readall())
+            await download_stream.readinto(f)
 
         return {
             "downloaded_at": datetime.utcnow(),
             "local_path": download_path,
-        }    
-    
+        }
 
-    def delete_file(self, blob_name: str):
+    async def delete_file(self, blob_name: str):
         """
         Delete a blob from Azure Storage.
         """
         blob_client = self.container_client.get_blob_client(blob_name)
-        blob_client.delete_blob()
-        return {"deleted_at": datetime.utcnow(), "blob_name": blob_name} 
\ No newline at end of file
+        await blob_client.delete_blob()
+        return {"deleted_at": datetime.utcnow(), "blob_name": blob_name}
@@ -2,6 +2,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.compnay_profile_repository import CompanyProfileRepository
 from app.models.compnay_profile import CompanyProfile
 from app.core.logging import get_logger
+from app.services.azure.azure_blob_service import AsyncAzureBlobService
 from app.utils.misc import mask_content
 from app.services.db.audit_service import log_audit
 
@@ -88,12 +89,22 @@ class CompanyProfileService:
         """
         return await self.repo.update(db=db, company_id=company_id, kyb_data=updated_data)
 
-    async def delete_company(self, db: AsyncSession, company_id: str) -> bool:
+    async def update_kyb_ledger(
+        self, db: AsyncSession, company_id: str, kyb_ledger: dict
+    ) -> CompanyProfile | None:
+        """
+        Save the per-document KYB contributions of the last generation.
+        """
+        return await self.repo.update_kyb_ledger(db=db, company_id=company_id, kyb_ledger=kyb_ledger)
+
+    async def delete_company(
+        self, db: AsyncSession, company_id: str, blob_service: AsyncAzureBlobService
+    ) -> bool:
         """
         Delete a company profile by ID using the repository.
         Returns True if deleted, False if not found.
         """
-        deleted = await self.repo.delete(db=db, company_id=company_id)
+        deleted = await self.repo.delete(db=db, company_id=company_id, blob_service=blob_service)
         return deleted
 
     async def save_manual_edits(
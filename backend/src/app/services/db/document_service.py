@@ -1,18 +1,62 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Dict, List
 from app.repositories.document_repository import DocumentRepository
+from app.repositories.document_text_repository import DocumentTextRepository
 from app.models.document import Document
+from app.utils.text_compression import TEXT_ENCODING
 
 class DocumentService:
     def __init__(self):
         self.repo = DocumentRepository()
+        self.text_repo = DocumentTextRepository()
 
     async def upload_documents(self, db: AsyncSession, data_list: list) -> List[Document]:
-        created_docs = []
-        for data in data_list:
-            doc = await self.repo.create(db=db, data=data)
-            created_docs.append(doc)
-        return created_docs
+        """
+        Insert document rows, together with their compressed page text when a
+        row carries one under "text_pages", in one transaction.
+        """
+        rows = [{k: v for k, v in data.items() if k not in ("text_pages", "page_count")} for data in data_list]
+        documents = await self.repo.bulk_create(db=db, data_list=rows, commit=False)
+
+        texts = [
+            {
+                "document_id": document.id,
+                "encoding": TEXT_ENCODING,
+                "page_count": data["page_count"],
+                "pages": data["text_pages"],
+            }
+            for document, data in zip(documents, data_list)
+            if data.get("text_pages") is not None
+        ]
+        await self.text_repo.bulk_create(db=db, data_list=texts, commit=False)
+
+        await db.commit()
+        return documents
+
+    async def get_document_texts(self, db: AsyncSession, document_ids: List[str]) -> Dict[str, bytes]:
+        """
+        Stored compressed page text keyed by document id (decompress with
+        app.utils.text_compression.decompress_pages). Documents ingested before
+        texts were stored are absent.
+        """
+        texts = await self.text_repo.get_by_document_ids(db=db, document_ids=document_ids)
+        return {
+            text.document_id: text.pages
+            for text in texts
+            if text.encoding == TEXT_ENCODING
+        }
+
+    async def find_by_content_hashes(
+        self, db: AsyncSession, company_id: str, content_hashes: List[str]
+    ) -> Dict[str, Document]:
+        """Map content hash -> earliest existing document of the company with that content."""
+        documents = await self.repo.get_by_content_hashes(
+            db=db, company_id=company_id, content_hashes=content_hashes
+        )
+        existing: Dict[str, Document] = {}
+        for doc in documents:
+            existing.setdefault(doc.content_hash, doc)
+        return existing
 
     async def get_documents_by_company(self, db: AsyncSession, company_id: str) -> List[Document]:
         return await self.repo.get_by_company_id(db=db, company_id=company_id)
\ No newline at end of file
@@ -0,0 +1,56 @@
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.process_pool import process_pool_workers, run_in_process_pool
+from app.services.kyb_pipeline.document_analyzer import (
+    analyze_document_file,
+    analyze_document_file_below,
+    analyze_extracted_pages,
+)
+from app.services.kyb_pipeline.document_classification_pipeline import mask_filename
+from app.services.kyb_pipeline.text_extraction import extract_page_range, split_page_ranges
+
+logger = get_logger(__name__)
+
+
+async def analyze_pdf(file_path: str, file_name: Optional[str] = None) -> Dict:
+    """
+    analyze_document_file in the analysis process pool.
+
+    When enabled, a PDF with at least `parallel_extraction_min_pages` pages
+    has its text extracted in page ranges on every pool worker at once; the
+    pages are reassembled in order and analyzed in one more pool task. The
+    result is the same as extracting it in a single worker. Smaller PDFs are
+    counted and analyzed in a single pool task.
+    """
+    file_name = file_name or os.path.basename(file_path)
+    workers = process_pool_workers()
+    min_pages = settings.parallel_extraction_min_pages
+
+    if min_pages <= 0 or workers < 2:
+        return await run_in_process_pool(analyze_document_file, file_path, file_name)
+
+    result, page_count = await run_in_process_pool(analyze_document_file_below, file_path, file_name, min_pages)
+    if result is not None:
+        return result
+
+    started = time.perf_counter()
+    ranges = split_page_ranges(page_count, workers)
+    chunks = await asyncio.gather(*(
+        run_in_process_pool(extract_page_range, file_path, start, stop) for start, stop in ranges
+    ))
+    pages = [page for chunk in chunks for page in chunk]
+
+    logger.info(
+        "PDF_PARALLEL_EXTRACTION | file=%s pages=%d ranges=%d seconds=%.3f",
+        mask_filename(file_name),
+        len(pages),
+        len(ranges),
+        time.perf_counter() - started,
+    )
+
+    return await run_in_process_pool(analyze_extracted_pages, file_name, pages)
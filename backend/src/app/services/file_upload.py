@@ -1,60 +1,304 @@
 from typing import List
 from fastapi import UploadFile
 from pathlib import Path
+import asyncio
+import hashlib
+import time
 import uuid
 import os
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.services.ingestion_service import DocumentIngestionService
+from app.services.azure.azure_blob_service import AsyncAzureBlobService
+from app.services.ingestion_service import DocumentIngestionService, log_deduplicated_upload
 from app.core.logging import get_logger
 from app.core.config import settings
 
 logger = get_logger(__name__)
 UPLOAD_DIR = Path(settings.temp_file_path)
 
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the per-file or per-batch size cap."""
+
+    def __init__(self, filename: str, limit: int, scope: str):
+        self.filename = filename
+        self.limit = limit
+        self.scope = scope  # "file" | "batch"
+        super().__init__(f"{filename} exceeds the {scope} upload limit of {limit} bytes")
+
+
+def _current_rss_kb() -> int:
+    """Resident set size of this process right now, in KiB (0 without /proc)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+async def stream_upload_to_disk(file: UploadFile, path: Path, max_bytes: int, scope: str = "file") -> dict:
+    """
+    Copy an UploadFile to disk in fixed-size chunks, hashing it on the way.
+
+    Never holds more than one chunk in memory. Raises UploadTooLargeError
+    (and removes the partial file) as soon as `max_bytes` is exceeded.
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    started = time.perf_counter()
+
+    try:
+        with path.open("wb") as out:
+            while chunk := await file.read(settings.upload_chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(file.filename, max_bytes, scope)
+                hasher.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+    return {
+        "path": path,
+        "size": size,
+        "sha256": hasher.hexdigest(),
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+def _failed_result(document_id: str, filename: str) -> dict:
+    return {
+        "document_id": document_id,
+        "filename": filename,
+        "status": "failed",
+    }
+
+
+def _deduplicated_result(document_id: str, filename: str, status: str) -> dict:
+    return {
+        "document_id": document_id,
+        "filename": filename,
+        "status": status,
+        "deduplicated": True,
+    }
+
+
+async def _analyze_spooled_file(
+    ingestion_service: DocumentIngestionService,
+    semaphore: asyncio.Semaphore,
+    spooled: dict,
+    company_id: str,
+    uploader: str,
+) -> dict:
+    """
+    Upload and analyze one spooled file under the batch semaphore.
+
+    Returns {"row": ...} with the not-yet-persisted metadata row, or a
+    failed result. Failures are isolated to the file.
+    """
+    path = spooled["path"]
+    filename = spooled["filename"]
+
+    try:
+        async with semaphore:
+            row = await ingestion_service.analyze_document(
+                file_path=str(path),
+                filename=filename,
+                company_id=company_id,
+                uploader=uploader,
+                delete_file=True,
+                content_hash=spooled["sha256"],
+            )
+
+        if row is None:
+            logger.warning("Upload skipped, unsupported file: %s", filename)
+            return _failed_result(spooled["document_id"], filename)
+
+        return {"row": row}
+
+    except Exception:
+        logger.exception("Upload failed: %s", filename)
+        return _failed_result(spooled["document_id"], filename)
+
+    finally:
+        if path.exists():
+            os.remove(path)
+
+
+async def spool_upload_batch(files: List[UploadFile], directory: Path) -> List[dict]:
+    """
+    Stream every file of an upload batch into `directory`.
+
+    Returns one slot per file, in input order: the stream_upload_to_disk
+    result plus "document_id"/"filename", or a failed result for a file that
+    could not be spooled. Exceeding the batch cap raises UploadTooLargeError
+    and removes everything spooled so far.
+    """
+    # Reject oversized batches up front when the sizes are already known
+    declared_total = sum(file.size or 0 for file in files)
+    if declared_total > settings.max_upload_batch_size:
+        raise UploadTooLargeError("upload batch", settings.max_upload_batch_size, "batch")
+
+    directory.mkdir(parents=True, exist_ok=True)
+    batch_bytes = 0
+    slots: List[dict] = []
+
+    try:
+        for file in files:
+            document_id = str(uuid.uuid4())
+            path = directory / f"{document_id}_{file.filename}"
+
+            # Cap each file by whatever is smaller: the per-file limit or the batch budget left
+            batch_remaining = settings.max_upload_batch_size - batch_bytes
+            file_limit = min(settings.max_upload_file_size, batch_remaining)
+            limit_scope = "file" if file_limit == settings.max_upload_file_size else "batch"
+
+            try:
+                spooled = await stream_upload_to_disk(file, path, max_bytes=file_limit, scope=limit_scope)
+            except UploadTooLargeError as e:
+                if e.scope == "batch":
+                    raise
+                logger.warning("Upload rejected: %s", e)
+                slots.append(_failed_result(document_id, file.filename))
+                continue
+            except Exception:
+                logger.exception("Upload failed: %s", file.filename)
+                slots.append(_failed_result(document_id, file.filename))
+                continue
+
+            batch_bytes += spooled["size"]
+            spooled.update({"document_id": document_id, "filename": file.filename})
+            slots.append(spooled)
+
+            logger.debug(
+                "UPLOAD_STREAMED | file=%s bytes=%d seconds=%.4f sha256=%s",
+                file.filename,
+                spooled["size"],
+                spooled["elapsed"],
+                spooled["sha256"],
+            )
+
+    except BaseException:
+        for slot in slots:
+            if "path" in slot and slot["path"].exists():
+                os.remove(slot["path"])
+        raise
+
+    return slots
+
+
 async def save_multiple_files(
     files: List[UploadFile],
     company_id: str,
     db: AsyncSession,
     uploader: str,
+    blob_service: AsyncAzureBlobService,
 ):
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-    ingestion_service = DocumentIngestionService()
-    results = []
+    ingestion_service = DocumentIngestionService(blob_service)
 
-    for file in files:
-        document_id = str(uuid.uuid4())
-        path = UPLOAD_DIR / f"{document_id}_{file.filename}"
+    batch_started = time.perf_counter()
+    rss_before_kb = _current_rss_kb()
 
-        try:
-            content = await file.read()
-            path.write_bytes(content)
+    # -------------------------------
+    # Step 1: Spool every file to disk (slot per file keeps input order)
+    # -------------------------------
+    slots = await spool_upload_batch(files, UPLOAD_DIR)
+    batch_bytes = sum(slot["size"] for slot in slots if "path" in slot)
 
-            document = await ingestion_service.ingest_document(
-                file_path=str(path),
-                filename=file.filename,
-                company_id=company_id,
-                db=db,
-                uploader=uploader,
-                delete_file=True
-            )
+    spool_elapsed = time.perf_counter() - batch_started
+    spool_rss_kb = _current_rss_kb()
+
+    # -------------------------------
+    # Step 2: Deduplicate by content hash (against the company and within the batch)
+    # -------------------------------
+    existing = await ingestion_service.find_duplicates(
+        db, company_id, sorted({slot["sha256"] for slot in slots if "path" in slot})
+    )
+    # End the lookup's transaction: the analysis below can take minutes and must
+    # not hold a pooled connection idle in transaction (rows stay loaded)
+    await db.commit()
+    first_in_batch: dict = {}
+
+    for i, slot in enumerate(slots):
+        if "path" not in slot:
+            continue
+        duplicate = existing.get(slot["sha256"])
+        if duplicate is not None:
+            log_deduplicated_upload(duplicate, slot["filename"], uploader)
+            os.remove(slot["path"])
+            slots[i] = _deduplicated_result(duplicate.id, slot["filename"], duplicate.status)
+        elif slot["sha256"] in first_in_batch:
+            os.remove(slot["path"])
+            slots[i] = {"duplicate_of": first_in_batch[slot["sha256"]], "filename": slot["filename"]}
+        else:
+            first_in_batch[slot["sha256"]] = i
+
+    # -------------------------------
+    # Step 3: Upload + analyze spooled files with bounded concurrency
+    # -------------------------------
+    semaphore = asyncio.Semaphore(max(1, settings.ingestion_concurrency))
+
+    async def _resolve(slot: dict) -> dict:
+        if "path" not in slot:
+            return slot  # already failed while spooling, or a duplicate
+        return await _analyze_spooled_file(ingestion_service, semaphore, slot, company_id, uploader)
+
+    # gather() returns results in input order regardless of completion order
+    results = list(await asyncio.gather(*(_resolve(slot) for slot in slots)))
 
-            results.append({
+    # -------------------------------
+    # Step 4: Persist all document metadata in one transaction
+    # -------------------------------
+    analyzed = [i for i, result in enumerate(results) if "row" in result]
+    rows = [results[i]["row"] for i in analyzed]
+
+    try:
+        documents = await ingestion_service.persist_documents(db, rows)
+    except Exception:
+        logger.exception("Failed to persist %d document(s) for company %s", len(rows), company_id)
+        documents = None
+
+    for position, i in enumerate(analyzed):
+        row = results[i]["row"]
+        if documents is None:
+            results[i] = _failed_result(row["id"], row["filename"])
+        elif documents[position].id != row["id"]:
+            # Same content stored concurrently by another upload
+            results[i] = _deduplicated_result(documents[position].id, row["filename"], documents[position].status)
+        else:
+            document = documents[position]
+            results[i] = {
                 "document_id": document.id,
                 "filename": document.filename,
                 "status": document.status,
-            })
+            }
 
-        except Exception as e:
-            logger.exception("Upload failed: %s", file.filename)
-            results.append({
-                "document_id": document_id,
-                "filename": file.filename,
-                "status": "failed",
-            })
+    # Repeats within the batch share the outcome of their first copy
+    for i, result in enumerate(results):
+        if "duplicate_of" in result:
+            first = results[result["duplicate_of"]]
+            if first["status"] == "failed":
+                results[i] = _failed_result(first["document_id"], result["filename"])
+            else:
+                results[i] = _deduplicated_result(first["document_id"], result["filename"], first["status"])
 
-        finally:
-            if path.exists():
-                os.remove(path)
+    # -------------------------------
+    # Throughput / memory numbers for pod sizing
+    # -------------------------------
+    # Spooling is where memory would grow with file size; analysis runs in the pool processes
+    batch_elapsed = time.perf_counter() - batch_started
+    logger.info(
+        "UPLOAD_BATCH_STREAMED | company_id=%s files=%d bytes=%d spool_seconds=%.3f bytes_per_sec=%d "
+        "total_seconds=%.3f rss_kb=%d spool_rss_growth_kb=%d",
+        company_id,
+        len(files),
+        batch_bytes,
+        spool_elapsed,
+        batch_bytes / spool_elapsed if spool_elapsed > 0 else 0,
+        batch_elapsed,
+        _current_rss_kb(),
+        spool_rss_kb - rss_before_kb,
+    )
 
     # -------------------------------
     # AUDIT LOG: User upload summary
@@ -77,4 +321,4 @@ async def save_multiple_files(
         }
     )
 
-    return results
\ No newline at end of file
+    return results
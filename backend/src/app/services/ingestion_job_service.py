@@ -0,0 +1,392 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from fastapi import UploadFile
+import asyncio
+import shutil
+import uuid
+import os
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import AsyncSessionLocal
+from app.models.ingestion_job import IngestionJob
+from app.repositories.ingestion_job_repository import IngestionJobRepository
+from app.services.azure.azure_blob_service import AsyncAzureBlobService
+from app.services.file_upload import spool_upload_batch
+from app.services.ingestion_service import DocumentIngestionService
+from app.core.logging import get_logger
+from app.core.config import settings
+
+logger = get_logger(__name__)
+JOB_SPOOL_DIR = Path(settings.ingestion_job_spool_path)
+
+# Per-file states that still need work after a restart
+PENDING_FILE_STATES = ("queued", "processing")
+
+
+class IngestionJobRunner:
+    """
+    Local worker pool for background ingestion jobs.
+
+    Submitted batches are spooled to disk and recorded in the ingestion_jobs
+    table before the request returns. Workers claim a job with a conditional
+    UPDATE, run every file through DocumentIngestionService and write per-file
+    progress back to the row, which doubles as a lease heartbeat. On startup,
+    and periodically while idle, workers pick up queued jobs and running jobs
+    whose lease expired, so jobs survive a restart of any app process sharing
+    the database and the spool directory.
+    """
+
+    def __init__(self, blob_service: AsyncAzureBlobService):
+        self.blob_service = blob_service
+        self.ingestion_service = DocumentIngestionService(blob_service)
+        self.repo = IngestionJobRepository()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._enqueued: Set[str] = set()
+        self._running: Set[str] = set()
+        self._workers: List[asyncio.Task] = []
+
+    # -------------------------------
+    # Lifecycle (owned by the FastAPI lifespan)
+    # -------------------------------
+    async def start(self):
+        workers = max(1, settings.ingestion_job_workers)
+        await self._recover()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"ingestion-job-worker-{i}")
+            for i in range(workers)
+        ]
+        logger.info("Ingestion job runner started (workers=%d)", workers)
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("Ingestion job runner stopped")
+
+    # -------------------------------
+    # Submission / status
+    # -------------------------------
+    async def submit(
+        self,
+        db: AsyncSession,
+        files: List[UploadFile],
+        company_id: str,
+        uploader: str,
+    ) -> IngestionJob:
+        """Spool the batch, record the job and queue it. Raises UploadTooLargeError."""
+        job_id = str(uuid.uuid4())
+        directory = JOB_SPOOL_DIR / job_id
+        try:
+            slots = await spool_upload_batch(files, directory)
+
+            job_files = []
+            for slot in slots:
+                spooled = "path" in slot
+                job_files.append({
+                    "filename": slot["filename"],
+                    "spool_path": str(slot["path"]) if spooled else None,
+                    "content_hash": slot["sha256"] if spooled else None,
+                    "size": slot["size"] if spooled else 0,
+                    "status": "queued" if spooled else "failed",
+                    "document_id": None,
+                    "deduplicated": False,
+                    "error": None if spooled else "upload rejected",
+                })
+
+            job = await self.repo.create(db, {
+                "id": job_id,
+                "company_id": company_id,
+                "uploader": uploader,
+                "status": "queued",
+                "files": job_files,
+            })
+        except BaseException:
+            # Also covers a batch rejected midway, which leaves the directory behind
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+
+        logger.info(
+            "INGESTION_JOB_QUEUED",
+            extra={
+                "audit": True,
+                "event_type": "INGESTION_JOB_QUEUED",
+                "job_id": job_id,
+                "company_id": company_id,
+                "actor": uploader,
+                "total_files": len(job_files),
+            }
+        )
+        self._enqueue(job_id)
+        return job
+
+    async def get_job(self, db: AsyncSession, job_id: str) -> Optional[IngestionJob]:
+        return await self.repo.get_by_id(db, job_id)
+
+    # -------------------------------
+    # Workers
+    # -------------------------------
+    def _enqueue(self, job_id: str):
+        if job_id not in self._enqueued and job_id not in self._running:
+            self._enqueued.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    def _stale_before(self) -> datetime:
+        return datetime.now(timezone.utc) - timedelta(seconds=settings.ingestion_job_lease_seconds)
+
+    async def _recover(self):
+        """Queue jobs left behind by a previous (or crashed) worker."""
+        try:
+            async with AsyncSessionLocal() as db:
+                job_ids = await self.repo.get_claimable_ids(db, self._stale_before())
+        except Exception:
+            logger.exception("Failed to look up pending ingestion jobs")
+            return
+
+        for job_id in job_ids:
+            self._enqueue(job_id)
+        if job_ids:
+            logger.info("Recovered %d pending ingestion job(s)", len(job_ids))
+
+    async def _worker(self):
+        while True:
+            try:
+                job_id = await asyncio.wait_for(
+                    self._queue.get(), timeout=settings.ingestion_job_sweep_seconds
+                )
+            except asyncio.TimeoutError:
+                await self._recover()
+                continue
+
+            self._enqueued.discard(job_id)
+            self._running.add(job_id)
+            try:
+                await self._run_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Requeued, or failed after ingestion_job_max_attempts (see _release_crashed)
+                logger.exception("Ingestion job %s crashed", job_id)
+            finally:
+                self._running.discard(job_id)
+
+    async def _run_job(self, job_id: str):
+        """
+        Claim the job under a fresh lease token and process it while a
+        heartbeat keeps the lease alive. Processing stops as soon as the
+        heartbeat finds the job held by another worker. A job interrupted by
+        shutdown is handed straight back to the queue.
+        """
+        owner = str(uuid.uuid4())
+        async with AsyncSessionLocal() as db:
+            job = await self.repo.claim(db, job_id, self._stale_before(), owner)
+        if job is None:
+            return  # finished, or held by another worker
+
+        if job.attempts > settings.ingestion_job_max_attempts:
+            # Earlier workers died holding it (the lease expired every time)
+            await self._release_crashed(job, owner, f"abandoned after {job.attempts - 1} attempts")
+            return
+
+        work = asyncio.create_task(self._process_job(job, owner))
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, owner, work))
+        interrupted = False
+        try:
+            await work
+        except asyncio.CancelledError:
+            lease_lost = heartbeat.done() and not heartbeat.cancelled() and heartbeat.result()
+            if lease_lost and asyncio.current_task().cancelling() == 0:
+                return  # only `work` was cancelled; the new holder carries on with the job
+            interrupted = True
+            raise
+        except Exception as e:
+            await self._release_crashed(job, owner, f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            heartbeat.cancel()
+            work.cancel()
+            await asyncio.gather(heartbeat, work, return_exceptions=True)
+            if interrupted:
+                await self._release_interrupted(job_id, owner)
+
+    async def _heartbeat(self, job_id: str, owner: str, work: asyncio.Task) -> bool:
+        """
+        Renew the lease every third of its length. Returns True (after
+        cancelling `work`) once the job is no longer held by `owner`.
+        """
+        interval = max(1.0, settings.ingestion_job_lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with AsyncSessionLocal() as db:
+                    held = await self.repo.renew_lease(db, job_id, owner)
+            except Exception:
+                # Retried at the next beat; the lease still has two thirds left
+                logger.exception("Failed to renew the lease of ingestion job %s", job_id)
+                continue
+
+            if not held:
+                logger.warning("Ingestion job %s is held by another worker, stopping", job_id)
+                work.cancel()
+                return True
+
+    async def _release_interrupted(self, job_id: str, owner: str):
+        """
+        Requeue a job whose runner is stopping (shutdown, deploy) without
+        spending an attempt, so another worker picks it up at once instead of
+        after the lease expires.
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                released = await self.repo.release(db, job_id, owner, requeue_without_attempt=True)
+        except Exception:
+            # The lease expires instead
+            logger.exception("Failed to requeue interrupted ingestion job %s", job_id)
+            return
+
+        if released:
+            logger.info("Ingestion job %s interrupted, requeued", job_id)
+
+    async def _release_crashed(self, job: IngestionJob, owner: str, error: str):
+        """
+        Requeue a crashed job, or mark it (and its unfinished files) failed
+        once it has used ingestion_job_max_attempts claims.
+        """
+        exhausted = job.attempts >= settings.ingestion_job_max_attempts
+        async with AsyncSessionLocal() as db:
+            current = await self.repo.get_by_id(db, job.id)
+            files = [dict(f) for f in current.files]
+            if exhausted:
+                for f in files:
+                    if f["status"] in PENDING_FILE_STATES:
+                        f.update(status="failed", error=error)
+
+            released = await self.repo.release(
+                db, job.id, owner, files, status="failed" if exhausted else "queued", error=error
+            )
+
+        if released and exhausted:
+            shutil.rmtree(JOB_SPOOL_DIR / job.id, ignore_errors=True)
+            logger.error(
+                f"Ingestion job {job.id} failed: {error}",
+                extra={
+                    "audit": True,
+                    "event_type": "INGESTION_JOB_FAILED",
+                    "job_id": job.id,
+                    "company_id": str(job.company_id),
+                    "actor": job.uploader,
+                    "attempts": job.attempts,
+                    "error": error,
+                }
+            )
+
+    async def _process_job(self, job: IngestionJob, owner: str):
+        job_id = job.id
+        async with AsyncSessionLocal() as db:
+            company_id = str(job.company_id)
+            uploader = job.uploader
+            files = [dict(f) for f in job.files]
+            progress_lock = asyncio.Lock()
+
+            async def _save_progress(index: int, **changes):
+                async with progress_lock:
+                    files[index] = {**files[index], **changes}
+                    # Assign a fresh list so the JSONB column is rewritten as a whole
+                    await self.repo.update_progress(db, job_id, owner, [dict(f) for f in files])
+
+            # Files sharing content with an earlier file of the job are resolved
+            # after it, so they deduplicate against its document instead of racing it
+            first_by_hash: Dict[str, int] = {}
+            leaders, repeats = [], []
+            for i, f in enumerate(files):
+                if f["status"] not in PENDING_FILE_STATES:
+                    continue
+                if f["content_hash"] in first_by_hash:
+                    repeats.append(i)
+                else:
+                    first_by_hash[f["content_hash"]] = i
+                    leaders.append(i)
+
+            semaphore = asyncio.Semaphore(max(1, settings.ingestion_concurrency))
+
+            async def _run(index: int):
+                async with semaphore:
+                    await self._run_file(files[index], index, company_id, uploader, _save_progress)
+
+            await asyncio.gather(*(_run(i) for i in leaders))
+            for i in repeats:
+                await self._run_file(files[i], i, company_id, uploader, _save_progress)
+
+            completed = await self.repo.update_progress(db, job_id, owner, files, status="completed")
+
+        if not completed:
+            # Re-claimed meanwhile: the spooled files belong to the new worker now
+            logger.warning("Ingestion job %s is held by another worker, not completed here", job_id)
+            return
+
+        shutil.rmtree(JOB_SPOOL_DIR / job_id, ignore_errors=True)
+
+        failed = [f["filename"] for f in files if f["status"] == "failed"]
+        logger.info(
+            f"Ingestion job {job_id} finished | Successful: {len(files) - len(failed)} | Failed: {len(failed)}",
+            extra={
+                "audit": True,
+                "event_type": "INGESTION_JOB_COMPLETED",
+                "job_id": job_id,
+                "company_id": company_id,
+                "actor": uploader,
+                "total_files": len(files),
+                "success_count": len(files) - len(failed),
+                "failed_count": len(failed),
+                "failed_files": failed,
+            }
+        )
+
+    async def _run_file(self, job_file: dict, index: int, company_id: str, uploader: str, save_progress):
+        """
+        Ingest one spooled file. Each file commits in its own session, so a
+        crash between the insert and the progress update is healed on retry by
+        the content-hash deduplication.
+        """
+        filename = job_file["filename"]
+        path = job_file["spool_path"]
+
+        if not path or not os.path.exists(path):
+            await save_progress(index, status="failed", error="spooled file missing")
+            return
+
+        await save_progress(index, status="processing")
+
+        try:
+            async with AsyncSessionLocal() as file_db:
+                duplicate = await self.ingestion_service.find_duplicate(
+                    file_db, company_id, job_file["content_hash"], filename, uploader
+                )
+                await file_db.commit()  # no transaction left idle during the analysis
+                if duplicate is not None:
+                    document_id, status, deduplicated = duplicate.id, duplicate.status, True
+                else:
+                    row = await self.ingestion_service.analyze_document(
+                        file_path=path,
+                        filename=filename,
+                        company_id=company_id,
+                        uploader=uploader,
+                        delete_file=False,  # kept until the outcome is recorded
+                        content_hash=job_file["content_hash"],
+                    )
+                    if row is None:
+                        await save_progress(index, status="failed", error="unsupported file type")
+                        return
+                    document = (await self.ingestion_service.persist_documents(file_db, [row]))[0]
+                    document_id, status, deduplicated = document.id, document.status, document.id != row["id"]
+
+        except Exception as e:
+            logger.exception("Ingestion job file failed: %s", filename)
+            await save_progress(index, status="failed", error=str(e))
+            return
+
+        await save_progress(
+            index, status=status, document_id=document_id, deduplicated=deduplicated, error=None
+        )
+        if os.path.exists(path):
+            os.remove(path)
@@ -1,13 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict
+from typing import List, Optional, Dict
+import asyncio
 import os
 import uuid
 from app.core.logging import get_logger
-from app.services.azure.azure_blob_service import AzureBlobService
+from app.models.document import Document
+from app.services.azure.azure_blob_service import AsyncAzureBlobService
 from app.services.db.document_service import DocumentService
-from app.services.kyb_pipeline.document_classification_pipeline import DocumentClassificationPipeline
-from app.utils.file import detect_file_type
+from app.services.kyb_pipeline.analysis_cache import ANALYSIS, analysis_cache_key, get_analysis_cache
+from app.services.document_analysis_service import analyze_pdf
+from app.utils.file import detect_file_type, sha256_file
 from app.core.config import settings
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.utils.misc import str_to_date
 
@@ -17,26 +21,51 @@ logger = get_logger(__name__)
 class BaseProcessor(ABC):
     """Abstract base class for all document processors."""
 
-    def __init__(self, session_id: str):
+    def __init__(self, session_id: str, blob_service: AsyncAzureBlobService):
         self.session_id = session_id
+        self.blob_service = blob_service
         self.temp_folder = settings.temp_file_path
         self.db_path = os.path.join(self.temp_folder, f"{session_id}.db")
         self.document_service = DocumentService()
-        self.document_classification_pipeline = DocumentClassificationPipeline()
         self.logger = logger
 
     @abstractmethod
+    async def analyze(
+        self,
+        file_path: str,
+        filename: str,
+        company_id: str,
+        uploader: str,
+        delete_file: bool = True,
+        content_hash: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Store and analyze the document; return its metadata row (not yet persisted)."""
+        pass
+
     async def process(
         self,
         file_path: str,
         filename: str,
-        session_id: str,
+        company_id: str,
         db: AsyncSession,
         uploader: str,
-        delete_file: bool = True
+        delete_file: bool = True,
+        content_hash: Optional[str] = None
     ):
         """Process the document and return DB object."""
-        pass
+        row = await self.analyze(
+            file_path=file_path,
+            filename=filename,
+            company_id=company_id,
+            uploader=uploader,
+            delete_file=delete_file,
+            content_hash=content_hash,
+        )
+        if row is None:
+            return None
+
+        documents = await persist_document_rows(db, self.blob_service, [row])
+        return documents[0]
 
     def _ensure_temp_folder(self):
         """Create temp folder if it doesn't exist."""
@@ -55,79 +84,83 @@ class BaseProcessor(ABC):
 class PDFProcessor(BaseProcessor):
     """Processor for PDF files with concise audit logs."""
 
-    async def process(
+    async def _analyze_file(self, file_path: str, filename: str, content_hash: Optional[str]) -> Dict:
+        """
+        Classify and extract document info (CPU-bound, off the event loop),
+        cached by content. The cached result also serves KYB generation.
+        """
+        if content_hash is None:
+            return await analyze_pdf(file_path, filename)
+
+        return await get_analysis_cache().get_or_compute(
+            ANALYSIS, analysis_cache_key(content_hash, filename), lambda: analyze_pdf(file_path, filename)
+        )
+
+    async def _upload_and_analyze(self, file_path: str, filename: str, content_hash: Optional[str]):
+        """
+        Run the blob upload and the document analysis side by side.
+
+        If either step fails the other one is cancelled (or awaited if it can
+        no longer be stopped) and a blob that was already written is deleted,
+        so a failed ingestion never leaves an orphaned blob behind.
+        """
+        upload_task = asyncio.create_task(
+            self.blob_service.upload_file(
+                file_path=file_path,
+                filename=filename,
+                content_type="application/pdf"
+            )
+        )
+        analysis_task = asyncio.create_task(self._analyze_file(file_path, filename, content_hash))
+
+        try:
+            return await asyncio.gather(upload_task, analysis_task)
+        except BaseException:
+            for task in (upload_task, analysis_task):
+                task.cancel()
+            await asyncio.gather(upload_task, analysis_task, return_exceptions=True)
+
+            if upload_task.done() and not upload_task.cancelled() and upload_task.exception() is None:
+                await discard_blob(self.blob_service, upload_task.result()["blob_name"])
+            raise
+
+    async def analyze(
         self,
         file_path: str,
         filename: str,
         company_id: str,
-        db: AsyncSession,
         uploader: str,
-        delete_file: bool = True
-    ):
+        delete_file: bool = True,
+        content_hash: Optional[str] = None
+    ) -> Optional[Dict]:
         document_id = str(uuid.uuid4())
 
         try:
-            # Upload file to blob storage
-            blob_service = AzureBlobService()
-            upload_result = blob_service.upload_file(
-                file_path=file_path,
-                filename=filename,
-                content_type="application/pdf"
-            )
-            blob_path = upload_result["blob_name"]
-
-            # Classify and extract document info
-            result = self.document_classification_pipeline.process_document(file_path)
-            classType = result["classType"]
-            issueDate = result["issueDate"]
-            expiryDate = result["expiryDate"]
-            confidence = result["confidence"]
-            language = result["language"]
-
-            # Save metadata in DB
-            document_list = await self.document_service.upload_documents(
-                db,
-                [
-                    {
-                        "filename": filename,
-                        "content_type": "application/pdf",
-                        "uploader": uploader,
-                        "blob_path": blob_path,
-                        "status": "uploaded",
-                        "company_id": company_id,
-                        "class_type": classType,
-                        "issue_date": str_to_date(issueDate),
-                        "expiry_date": str_to_date(expiryDate),
-                        "confidence": confidence,
-                        "language": language
-                    }
-                ]
-            )
+            # Upload to blob storage and classify concurrently: both only read the
+            # temp file and meet again at the metadata insert.
+            upload_result, result = await self._upload_and_analyze(file_path, filename, content_hash)
 
             if delete_file:
                 self._cleanup_uploaded_file(file_path)
 
-            document = document_list[0] if document_list else None
-
-            # Concise audit log
-            self.logger.info(
-                "DOCUMENT_INGESTION_SUCCESS",
-                extra={
-                    "audit": True,
-                    "event_type": "DOCUMENT_INGESTION_SUCCESS",
-                    "doc_name": filename,
-                    "document_id": document.id if document else document_id,
-                    "company_id": company_id,
-                    "uploader": uploader,
-                    "class_type": classType,
-                    "confidence": confidence,
-                    "language": language,
-                    "issue_date": issueDate,
-                    "expiry_date": expiryDate
-                }
-            )
-
-            return document
+            return {
+                "id": document_id,
+                "filename": filename,
+                "content_type": "application/pdf",
+                "uploader": uploader,
+                "blob_path": upload_result["blob_name"],
+                "status": "uploaded",
+                "company_id": company_id,
+                "class_type": result["classType"],
+                "issue_date": str_to_date(result["issueDate"]),
+                "expiry_date": str_to_date(result["expiryDate"]),
+                "confidence": result["confidence"],
+                "language": result["language"],
+                "content_hash": content_hash,
+                # stored in document_texts, not on the documents row
+                "text_pages": result["textPages"],
+                "page_count": result["pageCount"]
+            }
 
         except Exception as e:
             self.logger.error(
@@ -147,15 +180,15 @@ class PDFProcessor(BaseProcessor):
 class OtherProcessor(BaseProcessor):
     """Processor for unrecognized file types."""
 
-    async def process(
+    async def analyze(
         self,
         file_path: str,
         filename: str,
         company_id: str,
-        db: AsyncSession,
         uploader: str,
-        delete_file: bool = True
-    ) -> Optional[str]:
+        delete_file: bool = True,
+        content_hash: Optional[str] = None
+    ) -> Optional[Dict]:
         document_id = str(uuid.uuid4())
         self.logger.warning(
             "UNSUPPORTED_DOCUMENT",
@@ -172,16 +205,191 @@ class OtherProcessor(BaseProcessor):
         return None
 
 
+def log_deduplicated_upload(existing: Document, filename: str, uploader: str):
+    logger.info(
+        "DOCUMENT_DEDUPLICATED",
+        extra={
+            "audit": True,
+            "event_type": "DOCUMENT_DEDUPLICATED",
+            "doc_name": filename,
+            "document_id": existing.id,
+            "company_id": str(existing.company_id),
+            "uploader": uploader,
+            "blob_path": existing.blob_path,
+            "class_type": existing.class_type,
+        }
+    )
+
+
+async def discard_blob(blob_service: AsyncAzureBlobService, blob_name: str):
+    """Best-effort removal of a blob written for a failed ingestion."""
+    try:
+        await blob_service.delete_file(blob_name)
+        logger.info("Deleted orphaned blob: %s", blob_name)
+    except Exception as e:
+        logger.warning("Failed to delete orphaned blob %s: %s", blob_name, e)
+
+
+async def _persist_after_conflict(
+    db: AsyncSession,
+    blob_service: AsyncAzureBlobService,
+    rows: List[Dict],
+) -> List[Document]:
+    """
+    Retry of a batch that hit the unique (company_id, content_hash) index
+    because the same content was stored concurrently (another upload, or
+    the job runner). Rows whose content now exists resolve to that document
+    and their blob is deleted; the others are inserted again.
+    """
+    service = DocumentService()
+    existing: Dict[tuple, Document] = {}
+    for company_id in {row["company_id"] for row in rows}:
+        content_hashes = sorted({
+            row["content_hash"] for row in rows if row["company_id"] == company_id and row.get("content_hash")
+        })
+        found = await service.find_by_content_hashes(db, company_id, content_hashes)
+        existing.update({(company_id, content_hash): doc for content_hash, doc in found.items()})
+
+    def _existing(row: Dict) -> Optional[Document]:
+        return existing.get((row["company_id"], row.get("content_hash")))
+
+    inserted = iter(await service.upload_documents(db, [row for row in rows if _existing(row) is None]))
+
+    documents = []
+    for row in rows:
+        duplicate = _existing(row)
+        if duplicate is None:
+            documents.append(next(inserted))
+            continue
+        log_deduplicated_upload(duplicate, row["filename"], row["uploader"])
+        await discard_blob(blob_service, row["blob_path"])
+        documents.append(duplicate)
+    return documents
+
+
+async def persist_document_rows(
+    db: AsyncSession,
+    blob_service: AsyncAzureBlobService,
+    rows: List[Dict],
+) -> List[Document]:
+    """
+    Write the metadata of analyzed documents in a single transaction.
+
+    A row whose content was stored for the company in the meantime resolves
+    to the existing document (its id differs from row["id"]: a deduplicated
+    upload). On failure the blobs of every row are deleted again, since none
+    of them will be referenced by a documents row.
+    """
+    if not rows:
+        return []
+
+    try:
+        try:
+            documents = await DocumentService().upload_documents(db, rows)
+        except IntegrityError:
+            await db.rollback()
+            documents = await _persist_after_conflict(db, blob_service, rows)
+    except Exception as e:
+        await db.rollback()
+        await asyncio.gather(*(discard_blob(blob_service, row["blob_path"]) for row in rows))
+        for row in rows:
+            logger.error(
+                "DOCUMENT_INGESTION_FAILED",
+                extra={
+                    "audit": True,
+                    "event_type": "DOCUMENT_INGESTION_FAILED",
+                    "doc_name": row["filename"],
+                    "document_id": row["id"],
+                    "company_id": row["company_id"],
+                    "uploader": row["uploader"],
+                    "error": str(e),
+                }
+            )
+        raise
+
+    # Concise audit log
+    for row, document in zip(rows, documents):
+        if document.id != row["id"]:
+            continue  # deduplicated, logged above
+        logger.info(
+            "DOCUMENT_INGESTION_SUCCESS",
+            extra={
+                "audit": True,
+                "event_type": "DOCUMENT_INGESTION_SUCCESS",
+                "doc_name": document.filename,
+                "document_id": document.id,
+                "company_id": str(document.company_id),
+                "uploader": document.uploader,
+                "class_type": document.class_type,
+                "confidence": document.confidence,
+                "language": document.language,
+                "issue_date": document.issue_date.isoformat() if document.issue_date else None,
+                "expiry_date": document.expiry_date.isoformat() if document.expiry_date else None
+            }
+        )
+
+    return documents
+
+
 class DocumentIngestionService:
     """Main service class for document ingestion."""
 
-    def __init__(self):
+    def __init__(self, blob_service: AsyncAzureBlobService):
         self.logger = logger
+        self.blob_service = blob_service
         self._processor_map: Dict[str, type[BaseProcessor]] = {
             'pdf': PDFProcessor,
             'other': OtherProcessor,
         }
 
+    def _get_processor(self, file_path: str, company_id: str) -> BaseProcessor:
+        file_type = detect_file_type(file_path)
+        processor_class = self._processor_map.get(file_type, OtherProcessor)
+        return processor_class(company_id, self.blob_service)
+
+    async def find_duplicates(
+        self, db: AsyncSession, company_id: str, content_hashes: List[str]
+    ) -> Dict[str, Document]:
+        """Existing documents of the company, keyed by content hash."""
+        return await DocumentService().find_by_content_hashes(db, company_id, content_hashes)
+
+    async def find_duplicate(
+        self, db: AsyncSession, company_id: str, content_hash: str, filename: str, uploader: str
+    ) -> Optional[Document]:
+        """Existing document with the same content, audit-logged as a deduplicated upload."""
+        duplicate = (await self.find_duplicates(db, company_id, [content_hash])).get(content_hash)
+        if duplicate is not None:
+            log_deduplicated_upload(duplicate, filename, uploader)
+        return duplicate
+
+    async def analyze_document(
+        self,
+        file_path: str,
+        filename: str,
+        company_id: str,
+        uploader: str,
+        delete_file: bool = True,
+        content_hash: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Upload and analyze a document without writing its metadata row."""
+        processor = self._get_processor(file_path, company_id)
+        return await processor.analyze(
+            file_path=file_path,
+            filename=filename,
+            company_id=company_id,
+            uploader=uploader,
+            delete_file=delete_file,
+            content_hash=content_hash,
+        )
+
+    async def persist_documents(self, db: AsyncSession, rows: List[Dict]) -> List[Document]:
+        """
+        Persist rows returned by analyze_document in one transaction. A
+        returned document whose id differs from its row's is an existing
+        document with the same content (deduplicated).
+        """
+        return await persist_document_rows(db, self.blob_service, rows)
+
     async def ingest_document(
         self,
         file_path: str,
@@ -189,11 +397,19 @@ class DocumentIngestionService:
         company_id: str,
         db: AsyncSession,
         uploader: str,
-        delete_file: bool = True
+        delete_file: bool = True,
+        content_hash: Optional[str] = None
     ):
-        file_type = detect_file_type(file_path)
-        processor_class = self._processor_map.get(file_type, OtherProcessor)
-        processor = processor_class(company_id)
+        content_hash = content_hash or sha256_file(file_path)
+
+        # Same bytes already uploaded for this company: reuse that document
+        duplicate = await self.find_duplicate(db, company_id, content_hash, filename, uploader)
+        if duplicate is not None:
+            if delete_file and os.path.exists(file_path):
+                os.remove(file_path)
+            return duplicate
+
+        processor = self._get_processor(file_path, company_id)
 
         # Only call processor.process(), no extra start logs here
         return await processor.process(
@@ -203,4 +419,5 @@ class DocumentIngestionService:
             db=db,
             uploader=uploader,
             delete_file=delete_file,
-        )
\ No newline at end of file
+            content_hash=content_hash,
+        )
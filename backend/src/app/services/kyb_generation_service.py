@@ -1,176 +1,374 @@
+import asyncio
+import copy
+import hashlib
 import os
 import logging
 import tempfile
-from typing import Dict, List
+from collections import OrderedDict
 from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.azure.azure_blob_service import AzureBlobService
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.document import Document
+from app.services.azure.azure_blob_service import AsyncAzureBlobService
+from app.services.db.company_profile_service import CompanyProfileService
 from app.services.db.document_service import DocumentService
-from app.services.kyb_pipeline.kyb_extraction_piepline import KYBExtractionPipeline
+from app.services.kyb_pipeline.kyb_extraction_piepline import reduce_partials
+from app.services.kyb_pipeline.document_analyzer import analyze_document_text, stamp_processed_at
+from app.services.document_analysis_service import analyze_pdf
+from app.core.process_pool import run_in_process_pool
+from app.services.kyb_pipeline.analysis_cache import ANALYSIS, analysis_cache_key, get_analysis_cache, pipeline_version
+from app.services.kyb_pipeline.kyb_assembly import assemble_kyb_record
 from app.services.kyb_pipeline.risk_engine import RiskEngine
 
 logger = logging.getLogger(__name__)
 
- 
+
+def ledger_partials(ledger: Optional[Dict], documents: List[Document]) -> Dict[str, Dict]:
+    """
+    Partials of the ledger still valid for `documents`: same document id,
+    content hash and file name, recorded by the current pipeline version.
+    Entries of deleted documents are simply not returned.
+    """
+    if not ledger or ledger.get("version") != pipeline_version():
+        return {}
+
+    entries = ledger.get("documents", {})
+    partials = {}
+    for doc in documents:
+        entry = entries.get(doc.id)
+        if entry and entry["contentHash"] == doc.content_hash and entry["fileName"] == doc.filename:
+            partials[doc.id] = entry["partial"]
+    return partials
+
+
+def build_ledger(documents: List[Document], partials: Dict[str, Dict]) -> Dict:
+    """The contribution of every document to the unified object, by document id."""
+    return {
+        "version": pipeline_version(),
+        "documents": {
+            doc.id: {
+                "contentHash": doc.content_hash,
+                "fileName": doc.filename,
+                "partial": partials[doc.id],
+            }
+            for doc in documents
+        },
+    }
+
+
+def merge_order(doc: Document) -> Tuple[datetime, str]:
+    """Documents are merged in upload order, the id breaking ties."""
+    return doc.upload_time, doc.id
+
+
+def document_set_fingerprint(documents: List[Document]) -> str:
+    """
+    Everything a generated KYB record depends on besides manual edits: the
+    documents (id, content, name, upload order), the pipeline version and
+    today's date, which decides what counts as an expired document.
+    """
+    digest = hashlib.sha256(f"{pipeline_version()}|{datetime.utcnow().date().isoformat()}".encode())
+    for doc in sorted(documents, key=lambda doc: doc.id):
+        digest.update(f"\0{doc.id}|{doc.content_hash}|{doc.filename}|{doc.upload_time}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def document_event(doc: Document, partial: Dict, source: str) -> Dict:
+    """Progress event of a document whose classification and extraction are done."""
+    entry = partial["documents"][0]
+    return {
+        "event": "document_analyzed",
+        "documentId": doc.id,
+        "fileName": doc.filename,
+        "source": source,  # ledger | cache | analysis
+        "classType": entry["classType"],
+        "confidence": entry["confidence"],
+    }
+
+
+def _no_events(event: Dict) -> None:
+    pass
+
+
 class KYBGenerationService:
+    """
+    KYB generation for the API. One instance is shared by all requests:
+    concurrent calls for the same company and document set share a single
+    run, and the finished result is kept (one per company, LRU) until the
+    document set changes or invalidate() is called.
+
+    process_events() is the streaming variant: progress events of the run
+    (joined runs from the moment they are joined), then the result.
+    """
+
     def __init__(self):
-        self.azure_service = AzureBlobService()
+        self.company_service = CompanyProfileService()
         self.document_service = DocumentService()
-        self.extraction_pipeline = KYBExtractionPipeline()
-        self.risk_engine = RiskEngine()
         self.logger = logger
+        # (company_id, fingerprint) -> run and the event queues of its streaming callers
+        self._in_flight: Dict[Tuple[str, str], Tuple[asyncio.Task, List[asyncio.Queue]]] = {}
+        self._results: "OrderedDict[str, Tuple[str, Dict]]" = OrderedDict()  # company_id -> (fingerprint, result)
 
-        self.MANDATORY_DOCS = {
-            "Trade License",
-            "MOA / AOA",
-            "ID",
-            "Balance Sheet",
-            "Profit & Loss"
-        }
-
-        self.SUPPORTED_DOCS = {
-            "Trade License",
-            "MOA / AOA",
-            "Board Resolution",
-            "ID",
-            "Bank Letter",
-            "VAT / TRN",
-            "Balance Sheet",
-            "Profit & Loss"
-        }
-
-    async def process(self, db: AsyncSession, company_id: str) -> Dict:
+    async def process(self, db: AsyncSession, company_id: str, blob_service: AsyncAzureBlobService) -> Dict:
+        started = await self._start(db, company_id, blob_service)
+        if isinstance(started, dict):
+            return started
+
+        task, _ = started
+        # Shielded: a cancelled request must not cancel the run others wait on
+        return copy.deepcopy(await asyncio.shield(task))
+
+    async def process_events(self, company_id: str, blob_service: AsyncAzureBlobService) -> AsyncIterator[Dict]:
+        """
+        process() as progress events: "started", "document_analyzed" and
+        "document_downloaded" per document as they complete,
+        "compliance_validated", "risk_scored", and last "result" with what
+        process() returns. Opens its own session, so it can outlive the
+        request dependencies while a response is streamed.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        async with AsyncSessionLocal() as db:
+            started = await self._start(db, company_id, blob_service, events)
+        if isinstance(started, dict):
+            yield {"event": "result", "kyb_result": started}
+            return
+
+        task, subscribers = started
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+        finally:
+            if events in subscribers:
+                subscribers.remove(events)
 
+        try:
+            result = copy.deepcopy(await asyncio.shield(task))
+        except Exception as e:
+            result = {"status": "failed", "error": str(e)}
+        yield {"event": "result", "kyb_result": result}
+
+    async def _start(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        blob_service: AsyncAzureBlobService,
+        events: Optional[asyncio.Queue] = None,
+    ):
+        """
+        The finished result (failure or cached), else the run to wait on,
+        started or joined, with `events` subscribed to its progress.
+        """
         try:
             documents = await self.document_service.get_documents_by_company(db, company_id)
+        except Exception as e:
+            logger.exception(
+                "KYB_PROCESS_ERROR",
+                extra={"audit": True, "company_id": (company_id)}
+            )
+            return {"status": "failed", "error": str(e)}
 
-            if not documents:
-                logger.warning(
-                    "KYB_NO_DOCUMENTS_FOUND",
-                    extra={"audit": True, "company_id": (company_id)}
-                )
-                return {"status": "failed", "message": "No documents found for company"}
+        if not documents:
+            logger.warning(
+                "KYB_NO_DOCUMENTS_FOUND",
+                extra={"audit": True, "company_id": (company_id)}
+            )
+            return {"status": "failed", "message": "No documents found for company"}
+
+        key = (str(company_id), document_set_fingerprint(documents))
+        cached = self._results.get(key[0])
+        if cached is not None and cached[0] == key[1]:
+            self._results.move_to_end(key[0])
+            logger.info("KYB_RESULT_CACHE_HIT | company_id=%s", company_id)
+            return copy.deepcopy(cached[1])
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is None:
+            subscribers: List[asyncio.Queue] = []
+            task = asyncio.create_task(self._run(key, company_id, documents, blob_service, subscribers))
+            in_flight = self._in_flight[key] = (task, subscribers)
+        else:
+            logger.info("KYB_GENERATION_JOINED | company_id=%s", company_id)
+
+        if events is not None:
+            in_flight[1].append(events)
+        return in_flight
+
+    def invalidate(self, company_id: str) -> None:
+        """
+        Drop the cached result of a company (e.g. after a manual edit). Runs
+        still in flight finish for their callers but are not cached, and
+        later calls start a new run.
+        """
+        company_id = str(company_id)
+        self._results.pop(company_id, None)
+        for key in [key for key in self._in_flight if key[0] == company_id]:
+            del self._in_flight[key]
+
+    async def _run(
+        self,
+        key: Tuple[str, str],
+        company_id: str,
+        documents: List[Document],
+        blob_service: AsyncAzureBlobService,
+        subscribers: List[asyncio.Queue],
+    ) -> Dict:
+        """
+        One generation in its own session, independent of the request that
+        started it. Progress events go to every subscribed queue, None ends
+        each of them.
+        """
+        task = asyncio.current_task()
+
+        def emit(event: Dict) -> None:
+            for queue in subscribers:
+                queue.put_nowait(event)
+
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await self._generate(db, company_id, documents, blob_service, emit)
+
+            if self._in_flight.get(key, (None,))[0] is task and result["status"] == "success":
+                self._results.pop(key[0], None)
+                self._results[key[0]] = (key[1], result)
+                while len(self._results) > max(0, settings.kyb_result_cache_entries):
+                    self._results.popitem(last=False)
+            return result
+        finally:
+            if self._in_flight.get(key, (None,))[0] is task:
+                del self._in_flight[key]
+            emit(None)
+
+    async def _generate(
+        self,
+        db: AsyncSession,
+        company_id: str,
+        documents: List[Document],
+        blob_service: AsyncAzureBlobService,
+        emit: Callable[[Optional[Dict]], None] = _no_events,
+    ) -> Dict:
+
+        try:
+            # Step 1: Contributions recorded by the last generation. Only added
+            # (or replaced) documents are analyzed; deleted ones are retracted
+            # by leaving them out of the merge below.
+            company = await self.company_service.get_company_by_id(db, company_id)
+            ledger = company.kyb_ledger if company else None
+            partials: Dict[str, Dict] = ledger_partials(ledger, documents)
+            reused = len(partials)
+            from_ledger = set(partials)
+            retracted = len(set((ledger or {}).get("documents", {})) - {doc.id for doc in documents})
+
+            # Step 2: Analyses cached by content hash + file name (+ pipeline
+            # version), usually already computed at ingest
+            cache = get_analysis_cache()
+            cache_keys = {
+                doc.id: analysis_cache_key(doc.content_hash, doc.filename)
+                for doc in documents
+                if doc.content_hash and doc.id not in partials
+            }
+            cached = await asyncio.gather(*(cache.get(ANALYSIS, key) for key in cache_keys.values()))
+            partials.update(
+                (doc_id, analysis["kyb"]) for doc_id, analysis in zip(cache_keys, cached) if analysis is not None
+            )
+            pending = [doc for doc in documents if doc.id not in partials]
+
+            emit({
+                "event": "started",
+                "company_id": str(company_id),
+                "documents": len(documents),
+                "ledger": reused,
+                "cached": len(partials) - reused,
+                "pending": len(pending),
+            })
+            for doc in documents:
+                if doc.id in partials:
+                    emit(document_event(doc, partials[doc.id], "ledger" if doc.id in from_ledger else "cache"))
+
+            # Text stored at ingest makes downloading and re-parsing the PDF unnecessary
+            stored_texts = await self.document_service.get_document_texts(
+                db, [doc.id for doc in pending]
+            )
 
             with tempfile.TemporaryDirectory() as temp_dir:
 
-                downloaded_paths: List[str] = []
-
-                # Step 1: Download all documents
-                for doc in documents:
-                    blob_name = doc.blob_path
-                    filename = doc.filename
-                    local_path = os.path.join(temp_dir, filename)
-
- 
-                    self.azure_service.download_file(blob_name=blob_name, download_path=local_path)
-                    downloaded_paths.append(local_path)
-
- 
-
-                # Step 2: Initialize unified object
-                unified_company = {
-                    "companyProfile": {},
-                    "licenseDetails": {},
-                    "addresses": {},
-                    "shareholders": [],
-                    "ubos": [],
-                    "documents": [],
-                    "signatories": [],
-                    "financialIndicators": {},
-                    "riskAssessment": None,
-                    "complianceIndicators": {"exceptions": []},
-                    "missingFields": []
-                }
-
-                # Step 3: Extraction
-                for file_path in downloaded_paths:
-                    self.extraction_pipeline.update_unified_object(unified_company, file_path)
-
- 
-                # Step 4A: Compliance Validation
-                exceptions = []
-                missing_fields = []
-                uploaded_types = {doc["classType"] for doc in unified_company["documents"]}
-
-                # Missing mandatory documents
-                missing_docs = self.MANDATORY_DOCS - uploaded_types
-                for doc_type in missing_docs:
-                    exceptions.append({
-                        "type": "Missing Document",
-                        "message": f"{doc_type} not provided",
-                        "severity": "High",
-                        "impactedFields": ["documents"],
-                        "requiredAction": "Request document from client"
-                    })
-                    missing_fields.append(f"documents.{doc_type}")
-                # ----------------- AUDIT LOG FOR MISSING DOCUMENTS -----------------
-                if missing_docs:
-                    logger.warning(
-                        "MISSING_DOCUMENTS_DETECTED",
-                        extra={
-                            "audit": True,
-                            "company_id": (company_id),
-                            "missing_documents": ", ".join(missing_docs)
-                        }
-                    )
-                # Unsupported document types
-                for doc in unified_company["documents"]:
-                    if doc["classType"] not in self.SUPPORTED_DOCS:
-                        exceptions.append({
-                            "type": "Unsupported Document",
-                            "message": f"{doc['classType']} is not supported",
-                            "severity": "Medium",
-                            "impactedFields": ["documents"],
-                            "requiredAction": "Manual compliance review"
-                        })
-
-                # Expired documents
-                today = datetime.utcnow().date()
-                for doc in unified_company["documents"]:
-                    expiry = doc.get("expiryDate")
-                    if expiry:
-                        try:
-                            expiry_date = datetime.fromisoformat(expiry).date()
-                            if expiry_date < today:
-                                exceptions.append({
-                                    "type": "Expired Document",
-                                    "message": f"{(doc['fileName'])} is expired",
-                                    "severity": "High",
-                                    "impactedFields": ["documents.expiryDate"],
-                                    "requiredAction": "Request renewed document"
-                                })
-                        except Exception:
-                            logger.warning(
-                                "EXPIRY_DATE_PARSE_FAILED",
-                                extra={
-                                    "audit": True,
-                                    "company_id": (company_id),
-                                    "doc_name": (doc["fileName"])
-                                }
-                            )
-
-                unified_company["complianceIndicators"]["exceptions"] = exceptions
-                unified_company["missingFields"] = missing_fields
-
-                # Audit log: compliance summary
+                downloaded_paths: Dict[str, str] = {}
+
+                # Step 3: Download documents without stored text (ingested before
+                # texts were kept), concurrently over the shared connection pool.
+                # One sub-folder per document so equal filenames never collide.
+                for doc in pending:
+                    if doc.id not in stored_texts:
+                        downloaded_paths[doc.id] = os.path.join(temp_dir, doc.id, doc.filename)
+
+                async def _download(doc: Document) -> None:
+                    await blob_service.download_file(blob_name=doc.blob_path, download_path=downloaded_paths[doc.id])
+                    emit({"event": "document_downloaded", "documentId": doc.id, "fileName": doc.filename})
+
+                await asyncio.gather(*(_download(doc) for doc in pending if doc.id in downloaded_paths))
+
                 logger.info(
-                    "COMPLIANCE_VALIDATION_COMPLETE",
-                    extra={
-                        "audit": True,
-                        "company_id": (company_id),
-                        "missing_documents": None,
-                        "compliance_exceptions_count": len(exceptions)
-                    }
+                    "KYB_DOCUMENT_SOURCES | company_id=%s ledger=%d cached=%d stored_text=%d downloaded=%d",
+                    company_id,
+                    reused,
+                    len(partials) - reused,
+                    len(pending) - len(downloaded_paths),
+                    len(downloaded_paths),
+                )
+
+                # Step 4: Analysis of the remaining documents at once (CPU-bound, spread
+                # over the analysis process pool)
+                async def _analyze(doc: Document) -> Dict:
+                    async def _compute() -> Dict:
+                        if doc.id in stored_texts:
+                            return await run_in_process_pool(analyze_document_text, doc.filename, stored_texts[doc.id])
+                        return await analyze_pdf(downloaded_paths[doc.id])
+
+                    # Joins an analysis of the same content already running (e.g. its upload)
+                    if doc.id in cache_keys:
+                        analysis = await cache.get_or_compute(ANALYSIS, cache_keys[doc.id], _compute)
+                    else:
+                        analysis = await _compute()
+                    emit(document_event(doc, analysis["kyb"], "analysis"))
+                    return analysis
+
+                analyses = await asyncio.gather(*(_analyze(doc) for doc in pending))
+                for doc, analysis in zip(pending, analyses):
+                    partials[doc.id] = analysis["kyb"]
+
+                # Merge in upload order, whichever source or completion order
+                # each partial came from. A document was processed when its
+                # row was written at ingest.
+                ordered = sorted(documents, key=merge_order)
+                unified_company = reduce_partials(
+                    stamp_processed_at(partials[doc.id], doc.upload_time.isoformat()) for doc in ordered
                 )
 
-                # Step 4B: Financial Risk Scoring
-                self.risk_engine.reset()
-                self.risk_engine.evaluate_financial_risk(unified_company)
-                risk_result, exceptions = self.risk_engine.finalize()
-                unified_company["riskAssessment"] = risk_result
+                # Step 5: Compliance validation + financial risk scoring, always
+                # on the whole merged object
+                assemble_kyb_record(unified_company, company_id, RiskEngine())
+                emit({
+                    "event": "compliance_validated",
+                    "exceptions": unified_company["complianceIndicators"]["exceptions"],
+                    "missingFields": unified_company["missingFields"],
+                })
+                emit({"event": "risk_scored", "riskAssessment": unified_company["riskAssessment"]})
+
+                if company and (len(partials) != reused or retracted):
+                    await self.company_service.update_kyb_ledger(
+                        db, company_id, build_ledger(documents, partials)
+                    )
+
+                logger.info(
+                    "KYB_LEDGER | company_id=%s reused=%d added=%d retracted=%d",
+                    company_id,
+                    reused,
+                    len(partials) - reused,
+                    retracted,
+                )
 
- 
                 # Audit log: KYB process complete
                 logger.info(
                     "KYB_PROCESS_COMPLETE",
@@ -178,7 +376,7 @@ class KYBGenerationService:
                 )
 
                 # Cleanup
-                for path in downloaded_paths:
+                for path in downloaded_paths.values():
                     if os.path.exists(path):
                         os.remove(path)
 
@@ -0,0 +1,412 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+from importlib import import_module, metadata
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Cache namespaces
+ANALYSIS = "analysis"  # DocumentAnalyzer result of one document, with its page text
+
+# Disk entries are named <key><ENTRY_SUFFIX> under <version>-<DISK_FORMAT>/
+DISK_FORMAT = "json"
+ENTRY_SUFFIX = ".json.z"
+
+# Modules whose code or rule tables (keywords, date labels, field patterns)
+# determine the cached output; changing any of them changes the version.
+PIPELINE_MODULES = (
+    "app.services.kyb_pipeline.document_analyzer",
+    "app.services.kyb_pipeline.document_classification_pipeline",
+    "app.services.kyb_pipeline.document_type_registry",
+    "app.services.kyb_pipeline.statistical_classifier",
+    "app.services.kyb_pipeline.date_extraction",
+    "app.services.kyb_pipeline.kyb_extraction_piepline",
+    "app.services.kyb_pipeline.label_index",
+    "app.services.kyb_pipeline.text_extraction",
+    "app.utils.language",
+    "app.utils.paged_text",
+    "app.utils.text_compression",
+)
+
+
+@lru_cache(maxsize=None)
+def pipeline_version() -> str:
+    """
+    Fingerprint of everything that shapes an analysis result: the source of
+    PIPELINE_MODULES, the active text extractor and its library version,
+    the classifier setting and model file, and the language sample size.
+    Entries written under another version are never read again.
+    """
+    from app.services.kyb_pipeline.statistical_classifier import DEFAULT_MODEL_PATH
+    from app.services.kyb_pipeline.text_extraction import get_text_extractor
+
+    digest = hashlib.sha256()
+    for name in PIPELINE_MODULES:
+        digest.update(Path(import_module(name).__file__).read_bytes())
+
+    extractor = get_text_extractor()
+    try:
+        extractor_version = metadata.version(extractor.module)
+    except metadata.PackageNotFoundError:
+        extractor_version = "unknown"
+
+    classifier = settings.document_classifier.lower()
+    digest.update(f"{extractor.name}={extractor_version}|{classifier}|{settings.language_detection_sample_chars}".encode())
+    if classifier == "statistical":
+        model_path = Path(settings.document_classifier_model_path or DEFAULT_MODEL_PATH)
+        if model_path.exists():
+            digest.update(model_path.read_bytes())
+
+    return digest.hexdigest()[:16]
+
+
+def _encode_bytes(value: Any) -> Dict:
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _decode_bytes(obj: Dict) -> Any:
+    if len(obj) == 1 and "__bytes__" in obj:
+        return base64.b64decode(obj["__bytes__"])
+    return obj
+
+
+def encode_value(value: Any) -> bytes:
+    """Cache entry for a JSON-like value (bytes allowed, e.g. compressed page text)."""
+    text = json.dumps(value, default=_encode_bytes, ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(text.encode("utf-8"), 6)
+
+
+def decode_value(data: bytes) -> Any:
+    return json.loads(zlib.decompress(data).decode("utf-8"), object_hook=_decode_bytes)
+
+
+class AnalysisCache:
+    """
+    Content-addressed, two-tier cache of document analysis results.
+
+    Keys are a content hash (plus whatever else the result depends on, see
+    analysis_cache_key) within a namespace; the pipeline version is part
+    of every key, so a rules change invalidates all entries by itself.
+
+    - memory: in-process LRU of encoded results, bounded by `memory_bytes`
+    - disk: `disk_path/<version>-json/<namespace>/<key>.json.z`, bounded by
+      `disk_bytes`, least recently used files are evicted first. Shared by
+      the app processes on the host; each tracks the size it has seen, so
+      the bound is approximate with several processes. Directories of other
+      versions may belong to processes still running them (rolling deploys,
+      a shared volume); they are only removed once unused for
+      `stale_version_seconds`.
+
+    Values are stored as compressed JSON (see encode_value), never pickled,
+    so whoever can write to the disk directory can at worst plant wrong
+    results, not run code. Hits return a fresh copy, so callers may mutate
+    them. Cache failures, unreadable entries included, are logged and
+    treated as misses; they never fail an analysis.
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int,
+        disk_path: Optional[str],
+        disk_bytes: int,
+        version: str,
+        stale_version_seconds: int = 7 * 24 * 3600,
+    ):
+        self.memory_bytes = max(0, memory_bytes)
+        self.disk_bytes = max(0, disk_bytes)
+        self.version = version
+        self.stale_version_seconds = stale_version_seconds
+        self.disk_root = Path(disk_path) if disk_path and self.disk_bytes else None
+        self.disk_dir_name = f"{version}-{DISK_FORMAT}"
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._disk_files: "OrderedDict[Path, int]" = OrderedDict()  # LRU order
+        self._disk_size = 0
+        self._disk_loaded = False
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()  # serializes the one disk scan
+        self._in_flight: Dict[str, asyncio.Task] = {}  # "<namespace>/<key>" -> computation
+
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "joined": 0,  # misses that waited for a computation already running
+            "stores": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "errors": 0,
+        }
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        memory_key = f"{namespace}/{key}"
+        with self._lock:
+            data = self._memory.get(memory_key)
+            if data is not None:
+                self._memory.move_to_end(memory_key)
+                self.counters["memory_hits"] += 1
+
+        if data is None and self.disk_root is not None:
+            data = await asyncio.to_thread(self._disk_get, namespace, key)
+            if data is not None:
+                self._memory_put(memory_key, data)
+                with self._lock:
+                    self.counters["disk_hits"] += 1
+
+        if data is not None:
+            try:
+                return decode_value(data)
+            except (ValueError, zlib.error) as e:
+                self._discard(namespace, key)
+                with self._lock:
+                    self.counters["errors"] += 1
+                logger.warning("ANALYSIS_CACHE_CORRUPT_ENTRY | key=%s/%s error=%s", namespace, key, e)
+
+        with self._lock:
+            self.counters["misses"] += 1
+        return None
+
+    async def put(self, namespace: str, key: str, value: Any) -> None:
+        await self._put_encoded(namespace, key, encode_value(value))
+
+    async def get_or_compute(
+        self, namespace: str, key: str, compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        The cached value, else the result of compute(), stored. Concurrent
+        misses of one key share a single compute() run, which a cancelled
+        caller does not cancel for the others.
+        """
+        memory_key = f"{namespace}/{key}"
+        if memory_key not in self._in_flight:
+            cached = await self.get(namespace, key)
+            if cached is not None:
+                return cached
+
+        task = self._in_flight.get(memory_key)  # possibly started while we looked
+        if task is None:
+            task = asyncio.create_task(self._compute(namespace, key, compute))
+            self._in_flight[memory_key] = task
+        else:
+            with self._lock:
+                self.counters["joined"] += 1
+
+        return decode_value(await asyncio.shield(task))
+
+    async def _compute(self, namespace: str, key: str, compute: Callable[[], Awaitable[Any]]) -> bytes:
+        try:
+            data = encode_value(await compute())
+            await self._put_encoded(namespace, key, data)
+            return data
+        finally:
+            del self._in_flight[f"{namespace}/{key}"]
+
+    async def _put_encoded(self, namespace: str, key: str, data: bytes) -> None:
+        self._memory_put(f"{namespace}/{key}", data)
+        if self.disk_root is not None:
+            await asyncio.to_thread(self._disk_put, namespace, key, data)
+        with self._lock:
+            self.counters["stores"] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "version": self.version,
+                **self.counters,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_entries": len(self._disk_files),
+                "disk_bytes": self._disk_size,
+            }
+
+    def _discard(self, namespace: str, key: str) -> None:
+        """Forget an entry in memory; the disk file is replaced by the next put."""
+        with self._lock:
+            data = self._memory.pop(f"{namespace}/{key}", None)
+            if data is not None:
+                self._memory_size -= len(data)
+
+    # -------------------------
+    # Memory tier
+    # -------------------------
+    def _memory_put(self, memory_key: str, data: bytes) -> None:
+        if len(data) > self.memory_bytes:
+            return
+
+        with self._lock:
+            previous = self._memory.pop(memory_key, None)
+            if previous is not None:
+                self._memory_size -= len(previous)
+            self._memory[memory_key] = data
+            self._memory_size += len(data)
+
+            while self._memory_size > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+                self.counters["memory_evictions"] += 1
+
+    # -------------------------
+    # Disk tier (runs in a thread)
+    # -------------------------
+    def _disk_path(self, namespace: str, key: str) -> Path:
+        return self.disk_root / self.disk_dir_name / namespace / key[:2] / f"{key}{ENTRY_SUFFIX}"
+
+    def _is_stale_version(self, directory: Path) -> bool:
+        """No file of another version's directory was read or written recently."""
+        cutoff = time.time() - self.stale_version_seconds
+        for dirpath, _, filenames in os.walk(directory):
+            for filename in filenames:
+                try:
+                    if os.stat(os.path.join(dirpath, filename)).st_mtime >= cutoff:
+                        return False
+                except FileNotFoundError:
+                    continue  # evicted or replaced by another process meanwhile
+        return True
+
+    def _load_disk_index(self) -> None:
+        """
+        Drop the directories of unused other pipeline versions and index the
+        current one, once; concurrent callers wait for the first scan.
+        """
+        if self._disk_loaded:
+            return
+
+        with self._index_lock:
+            if self._disk_loaded:
+                return
+
+            try:
+                self.disk_root.mkdir(parents=True, exist_ok=True)
+                for entry in self.disk_root.iterdir():
+                    if entry.is_dir() and entry.name != self.disk_dir_name and self._is_stale_version(entry):
+                        shutil.rmtree(entry, ignore_errors=True)
+                        logger.info("ANALYSIS_CACHE_VERSION_DROPPED | version=%s", entry.name)
+
+                # Files other processes evict or replace during the scan are skipped
+                files = []
+                for dirpath, _, filenames in os.walk(self.disk_root / self.disk_dir_name):
+                    for filename in filenames:
+                        if not filename.endswith(ENTRY_SUFFIX):
+                            continue
+                        path = Path(dirpath) / filename
+                        try:
+                            stat = path.stat()
+                        except FileNotFoundError:
+                            continue
+                        files.append((stat.st_mtime, path, stat.st_size))
+            except OSError as e:
+                self._disk_error("index", e)  # scanned again by the next disk access
+                return
+
+            with self._lock:
+                # Oldest first; entries already recorded by a put (after a failed scan) stay newest
+                index = OrderedDict(
+                    (path, size) for _, path, size in sorted(files) if path not in self._disk_files
+                )
+                index.update(self._disk_files)
+                self._disk_files = index
+                self._disk_size = sum(index.values())
+                self._disk_loaded = True
+
+    def _disk_get(self, namespace: str, key: str) -> Optional[bytes]:
+        self._load_disk_index()
+        path = self._disk_path(namespace, key)
+
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # recency survives restarts through the mtime
+        except FileNotFoundError:
+            with self._lock:
+                if path in self._disk_files:  # evicted by another process
+                    self._disk_size -= self._disk_files.pop(path)
+            return None
+        except OSError as e:
+            self._disk_error("read", e)
+            return None
+
+        with self._lock:
+            self._disk_size -= self._disk_files.pop(path, 0)
+            self._disk_files[path] = len(data)
+            self._disk_size += len(data)
+        return data
+
+    def _disk_put(self, namespace: str, key: str, data: bytes) -> None:
+        if len(data) > self.disk_bytes:
+            return
+
+        self._load_disk_index()
+        path = self._disk_path(namespace, key)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            temp_path.unlink(missing_ok=True)
+            self._disk_error("write", e)
+            return
+
+        with self._lock:
+            self._disk_size -= self._disk_files.pop(path, 0)
+            self._disk_files[path] = len(data)
+            self._disk_size += len(data)
+
+            evicted = []
+            while self._disk_size > self.disk_bytes:
+                old_path, size = self._disk_files.popitem(last=False)
+                self._disk_size -= size
+                evicted.append(old_path)
+            self.counters["disk_evictions"] += len(evicted)
+
+        for old_path in evicted:
+            old_path.unlink(missing_ok=True)
+
+    def _disk_error(self, operation: str, error: OSError) -> None:
+        with self._lock:
+            self.counters["errors"] += 1
+        logger.warning("ANALYSIS_CACHE_DISK_ERROR | op=%s error=%s", operation, error)
+
+
+def analysis_cache_key(content_hash: str, file_name: str) -> str:
+    """Analysis results name their source file, so the file name is part of the key."""
+    return hashlib.sha256(f"{content_hash}\0{file_name}".encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def get_analysis_cache() -> AnalysisCache:
+    """The process-wide cache configured from settings."""
+    cache = AnalysisCache(
+        memory_bytes=settings.analysis_cache_memory_bytes,
+        disk_path=settings.analysis_cache_path,
+        disk_bytes=settings.analysis_cache_disk_bytes,
+        version=pipeline_version(),
+        stale_version_seconds=settings.analysis_cache_stale_version_seconds,
+    )
+    logger.info(
+        "ANALYSIS_CACHE_READY | version=%s memory_bytes=%d disk=%s disk_bytes=%d",
+        cache.version,
+        cache.memory_bytes,
+        cache.disk_root,
+        cache.disk_bytes,
+    )
+    return cache
@@ -0,0 +1,157 @@
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Optional, Protocol, Sequence, Tuple
+from dateutil import parser as date_parser
+
+# Label priority per date field: the first label whose value parses wins
+ISSUE_DATE_LABELS = ("ISSUE DATE", "DATE OF ISSUE", "REGISTRATION DATE")
+EXPIRY_DATE_LABELS = ("EXPIRY DATE", "DATE OF EXPIRY")
+
+ALL_DATE_LABELS = ISSUE_DATE_LABELS + EXPIRY_DATE_LABELS
+
+# Numeric dates on the documents are written day first (03/04/2024 is 3 April)
+DAYFIRST = True
+
+# Every label in one scan. Only "LABEL:" is consumed, so a label inside the
+# value of another one on the same line is still found, as with separate
+# searches; VALUE_PATTERN then reads the value after it.
+LABEL_PATTERN = re.compile(
+    "(" + "|".join(map(re.escape, ALL_DATE_LABELS)) + "):",
+    re.IGNORECASE,
+)
+VALUE_PATTERN = re.compile(r"\s*(.+)")
+
+MONTHS = {
+    "JAN": 1, "JANUARY": 1,
+    "FEB": 2, "FEBRUARY": 2,
+    "MAR": 3, "MARCH": 3,
+    "APR": 4, "APRIL": 4,
+    "MAY": 5,
+    "JUN": 6, "JUNE": 6,
+    "JUL": 7, "JULY": 7,
+    "AUG": 8, "AUGUST": 8,
+    "SEP": 9, "SEPT": 9, "SEPTEMBER": 9,
+    "OCT": 10, "OCTOBER": 10,
+    "NOV": 11, "NOVEMBER": 11,
+    "DEC": 12, "DECEMBER": 12,
+}
+
+YEAR_FIRST = re.compile(r"(\d{4})([-/.])(\d{1,2})\2(\d{1,2})")        # 2024-03-12
+YEAR_LAST = re.compile(r"(\d{1,2})([-/.])(\d{1,2})\2(\d{4})")         # 12-03-2024, 12/03/2024
+DAY_MONTH_NAME = re.compile(r"(\d{1,2})(?:-| +)([A-Za-z]+)(?:-|,? +)(\d{4})")  # 12 March 2024, 12-Mar-2024
+MONTH_NAME_DAY = re.compile(r"([A-Za-z]+) +(\d{1,2}),? +(\d{4})")      # March 12, 2024
+
+
+class DateLabelIndex:
+    """
+    First value of every date label in a text, found by one shared scan
+    that only advances as far as the labels asked for so far require.
+    """
+
+    def __init__(self, text: str):
+        self._text = text
+        self._matches = LABEL_PATTERN.finditer(text)
+        self._found: Dict[str, Tuple[str, int]] = {}  # label -> (value, label offset)
+
+    def _find(self, label: str) -> Optional[Tuple[str, int]]:
+        while label not in self._found and self._matches is not None:
+            match = next(self._matches, None)
+            if match is None:
+                self._matches = None  # text exhausted
+                break
+            found = match.group(1).upper()
+            if found in self._found:
+                continue
+            value = VALUE_PATTERN.match(self._text, match.end())
+            if value is not None:
+                self._found[found] = (value.group(1), match.start())
+        return self._found.get(label)
+
+    def get(self, label: str) -> Optional[str]:
+        """Rest of the line after the first `label:` (None when absent)."""
+        found = self._find(label)
+        return found[0] if found else None
+
+    def offset(self, label: str) -> Optional[int]:
+        """Offset of the first `label:` in the text (None when absent)."""
+        found = self._find(label)
+        return found[1] if found else None
+
+
+class LabelLookup(Protocol):
+    """DateLabelIndex, or a label_index.LabelIndex that includes ALL_DATE_LABELS."""
+
+    def get(self, label: str) -> Optional[str]: ...
+
+
+def _fast_parse(value: str, dayfirst: bool) -> Optional[date]:
+    """
+    Common formats, read the way dateutil reads them with the same
+    `dayfirst`. Returns None to defer to dateutil (unknown format, or a
+    value dateutil would have to reinterpret).
+    """
+    try:
+        match = YEAR_FIRST.fullmatch(value)
+        if match:
+            year, a, b = int(match.group(1)), int(match.group(3)), int(match.group(4))
+            # dateutil applies dayfirst to year-first dates as well
+            return date(year, b, a) if dayfirst else date(year, a, b)
+
+        match = YEAR_LAST.fullmatch(value)
+        if match:
+            a, b, year = int(match.group(1)), int(match.group(3)), int(match.group(4))
+            return date(year, b, a) if dayfirst else date(year, a, b)
+
+        match = DAY_MONTH_NAME.fullmatch(value)
+        if match and match.group(2).upper() in MONTHS:
+            return date(int(match.group(3)), MONTHS[match.group(2).upper()], int(match.group(1)))
+
+        match = MONTH_NAME_DAY.fullmatch(value)
+        if match and match.group(1).upper() in MONTHS:
+            return date(int(match.group(3)), MONTHS[match.group(1).upper()], int(match.group(2)))
+
+    except ValueError:
+        return None  # e.g. month 13: dateutil may still swap day and month
+
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_cached(value: str, dayfirst: bool, today: date) -> Optional[str]:
+    parsed = _fast_parse(value, dayfirst)
+    if parsed is None:
+        try:
+            # `today` is part of the cache key: dateutil fills missing parts from it
+            parsed = date_parser.parse(value, dayfirst=dayfirst).date()
+        except Exception:
+            return None
+    return parsed.isoformat()
+
+
+def parse_date(value: str, dayfirst: bool) -> Optional[str]:
+    """ISO date for a label value, or None when it is not a date."""
+    return _parse_date_cached(value.strip(), dayfirst, date.today())
+
+
+def first_parsed_date(labels: LabelLookup, priority: Sequence[str], dayfirst: bool) -> Optional[str]:
+    """Date of the first label in `priority` that is present and parses."""
+    for label in priority:
+        value = labels.get(label)
+        if value is not None:
+            parsed = parse_date(value, dayfirst)
+            if parsed is not None:
+                return parsed
+    return None
+
+
+def extract_issue_and_expiry_dates(
+    text: str, dayfirst: bool, labels: Optional[LabelLookup] = None
+) -> Dict[str, Optional[str]]:
+    """Issue and expiry date of `text`; `labels` may pass an index already built for it."""
+    if labels is None:
+        labels = DateLabelIndex(text)
+    return {
+        "issueDate": first_parsed_date(labels, ISSUE_DATE_LABELS, dayfirst),
+        "expiryDate": first_parsed_date(labels, EXPIRY_DATE_LABELS, dayfirst),
+    }
@@ -0,0 +1,144 @@
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from app.core.logging import get_logger
+from app.services.kyb_pipeline.document_classification_pipeline import DocumentClassificationPipeline, mask_filename
+from app.services.kyb_pipeline.kyb_extraction_piepline import KYBExtractionPipeline
+from app.services.kyb_pipeline.text_extraction import count_pages
+from app.utils.paged_text import PagedText
+from app.utils.text_compression import compress_pages, decompress_pages
+
+logger = get_logger(__name__)
+
+
+class DocumentAnalyzer:
+    """
+    Everything ingest and KYB generation need from one document, in a
+    single pass over its text: classification, issue/expiry dates,
+    language and the KYB field extractions.
+
+    There is one classifier (DocumentClassificationPipeline's keyword
+    rules or statistical model) and one date reading (DAYFIRST), so the
+    documents row written at ingest and the KYB record always agree. The
+    document dates and every "LABEL: value" field come from one label
+    index; all scans run on the PagedText's shared upper-cased view.
+    """
+
+    def __init__(self):
+        self.classification = DocumentClassificationPipeline()
+        self.extraction = KYBExtractionPipeline()
+
+    def analyze(self, doc: PagedText, file_name: str) -> Dict:
+        """
+        Ingest fields at the top level, the KYB partial unified object
+        (with this document's entry in "documents") under "kyb".
+
+        Results are cached by content, so they carry no processing time:
+        callers stamp "processedAt" on the document entry (see
+        stamp_processed_at).
+        """
+        logger.info(
+            "DOCUMENT_PROCESSING_STARTED",
+            extra={
+                "file_name": mask_filename(file_name),
+                "processed_at": datetime.utcnow().isoformat()
+            }
+        )
+
+        labels = self.extraction.index_labels(doc)
+        classification = self.classification.classify_paged(doc)
+        dates = self.classification.extract_issue_and_expiry(doc.upper, labels)
+        language = self.classification.detect_language(doc.text)
+
+        document = {
+            "fileName": file_name,
+            "classType": classification["classType"],
+            "confidence": classification["confidence"],
+            "issueDate": dates["issueDate"],
+            "expiryDate": dates["expiryDate"],
+            "pageCount": len(doc)
+        }
+
+        result = {
+            "fileName": file_name,
+            "classType": classification["classType"],
+            "issueDate": dates["issueDate"],
+            "expiryDate": dates["expiryDate"],
+            "confidence": classification["confidence"],
+            "language": language,
+            "pageCount": len(doc),
+            "kyb": self.extraction.extract_partial(doc, labels, file_name, document)
+        }
+
+        logger.info(
+            "DOCUMENT_PROCESSING_COMPLETED",
+            extra={
+                "file_name": mask_filename(file_name),
+                "class_type": classification["classType"],
+                "confidence": classification["confidence"],
+                "language": language
+            }
+        )
+
+        return result
+
+
+def stamp_processed_at(partial: Dict, processed_at: str) -> Dict:
+    """Copy of a KYB partial whose document entries carry `processed_at`."""
+    return {
+        **partial,
+        "documents": [{**document, "processedAt": processed_at} for document in partial["documents"]],
+    }
+
+
+# --------------------------------------------------
+# PROCESS POOL ENTRY POINTS
+# --------------------------------------------------
+def analyze_document_file(file_path: str, file_name: Optional[str] = None) -> Dict:
+    """
+    Analyze a PDF (runs in a pool worker). `file_name` is the name the
+    results refer to (default: the file's basename).
+
+    The per-page text is returned compressed under "textPages" so it can
+    be stored and analyzed again without parsing the PDF.
+    """
+    analyzer = DocumentAnalyzer()
+    pages = analyzer.classification.extract_pages(file_path)
+    return analyze_extracted_pages(file_name or os.path.basename(file_path), pages, analyzer)
+
+
+def analyze_document_file_below(
+    file_path: str, file_name: str, max_pages: int
+) -> Tuple[Optional[Dict], int]:
+    """
+    analyze_document_file for a PDF with fewer than `max_pages` pages, in the
+    same pool task that counts them. Larger PDFs are only counted: (None,
+    page count), for the caller to extract in parallel page ranges.
+    """
+    page_count = count_pages(file_path)
+    if page_count >= max_pages:
+        return None, page_count
+    return analyze_document_file(file_path, file_name), page_count
+
+
+def analyze_extracted_pages(
+    file_name: str, pages: List[str], analyzer: Optional[DocumentAnalyzer] = None
+) -> Dict:
+    """analyze_document_file for pages extracted elsewhere, e.g. in parallel page ranges."""
+    result = analyze_document_pages(file_name, pages, analyzer)
+    result["textPages"] = compress_pages(pages)
+    return result
+
+
+def analyze_document_text(file_name: str, compressed_pages: bytes) -> Dict:
+    """Analyze page text stored at ingest (runs in a pool worker)."""
+    result = analyze_document_pages(file_name, decompress_pages(compressed_pages))
+    result["textPages"] = compressed_pages
+    return result
+
+
+def analyze_document_pages(
+    file_name: str, pages: List[str], analyzer: Optional[DocumentAnalyzer] = None
+) -> Dict:
+    """Analyze already extracted page text."""
+    return (analyzer or DocumentAnalyzer()).analyze(PagedText(pages), file_name)
@@ -1,18 +1,18 @@
 import os
-import re
-from typing import Optional, Dict
-from PyPDF2 import PdfReader
-from dateutil import parser as date_parser
+from typing import Iterable, Iterator, List, Optional, Dict, Tuple
 from datetime import datetime
-from langdetect import detect, DetectorFactory
+from app.core.config import settings
 from app.core.logging import get_logger
+from app.services.kyb_pipeline.statistical_classifier import StatisticalDocumentClassifier, load_classifier
+from app.services.kyb_pipeline.date_extraction import DAYFIRST, LabelLookup, extract_issue_and_expiry_dates
+from app.services.kyb_pipeline.text_extraction import get_text_extractor
+from app.services.kyb_pipeline.document_type_registry import DocumentTypeRegistry, KeywordHit, first_hit
+from app.utils.language import detect_language_sample
+from app.utils.paged_text import PagedText
+from app.utils.text_compression import join_pages
 
 logger = get_logger(__name__)
 
-# Ensure consistent results
-DetectorFactory.seed = 0
-
-
 SUPPORTED_DOCUMENT_TYPES = {
     "TRADE LICENSE": "Trade License",
     "MEMORANDUM OF ASSOCIATION": "MOA / AOA",
@@ -25,6 +25,11 @@ SUPPORTED_DOCUMENT_TYPES = {
     "PROFIT & LOSS": "Profit & Loss",        # changed
 }
 
+DOCUMENT_TYPE_REGISTRY = DocumentTypeRegistry(SUPPORTED_DOCUMENT_TYPES)
+
+# Characters at the start of the document that count as its header
+HEADER_LENGTH = 300
+
 # -----------------------------
 # Utility: Safe Masking
 # -----------------------------
@@ -39,31 +44,35 @@ class DocumentClassificationPipeline:
     # --------------------------------------------------
     # TEXT EXTRACTION
     # --------------------------------------------------
-    def extract_text(self, file_path: str) -> str:
+    def iter_pages(self, file_path: str) -> Iterator[str]:
+        """
+        Yield the text of each page, extracting it only when the page is
+        requested. Stopping early skips the extraction of the remaining pages.
+        """
         logger.info(
             "PDF_TEXT_EXTRACTION_STARTED",
             extra={"file_name": mask_filename(os.path.basename(file_path))}
         )
 
         try:
-            reader = PdfReader(file_path)
-            text = ""
-
-            for page_number, page in enumerate(reader.pages):
-                page_text = page.extract_text() or ""
-                text += page_text + "\n"
+            extractor = get_text_extractor()
+            pages = 0
+            characters = 0
+            for text in extractor.iter_pages(file_path):
+                pages += 1
+                characters += len(text) + 1
+                yield text
 
             logger.info(
                 "PDF_TEXT_EXTRACTION_COMPLETED",
                 extra={
                     "file_name": mask_filename(os.path.basename(file_path)),
-                    "pages": len(reader.pages),
-                    "characters_extracted": len(text)
+                    "extractor": extractor.name,
+                    "pages": pages,
+                    "characters_extracted": characters
                 }
             )
 
-            return text
-
         except Exception as e:
             logger.error(
                 "PDF_TEXT_EXTRACTION_FAILED",
@@ -74,12 +83,18 @@ class DocumentClassificationPipeline:
             )
             raise
 
+    def extract_pages(self, file_path: str) -> List[str]:
+        return list(self.iter_pages(file_path))
+
+    def extract_text(self, file_path: str) -> str:
+        return join_pages(self.extract_pages(file_path))
+
     # --------------------------------------------------
     # LANGUAGE DETECTION
     # --------------------------------------------------
     def detect_language(self, text: str) -> str:
         try:
-            lang = detect(text)
+            lang = detect_language_sample(text, settings.language_detection_sample_chars)
 
             logger.info(
                 "DOCUMENT_LANGUAGE_DETECTED",
@@ -98,27 +113,34 @@ class DocumentClassificationPipeline:
     # --------------------------------------------------
     # DOCUMENT CLASSIFICATION
     # --------------------------------------------------
-    def classify_document(self, text: str) -> Dict:
+    def _score(self, hits: List[KeywordHit]) -> Dict:
         confidence = 0.0
         detected_type = "Unsupported"
 
-        text_upper = text.upper()
+        # The earliest keyword in the text decides the type
+        first = first_hit(hits)
+        if first is not None:
+            detected_type = first.doc_type
 
-        for keyword, doc_type in SUPPORTED_DOCUMENT_TYPES.items():
-            if keyword in text_upper:
-                detected_type = doc_type
-                confidence += 0.5
+        # Every distinct keyword found adds confidence
+        confidence += 0.5 * len({hit.keyword for hit in hits})
 
         # Boost confidence if keyword appears in header
-        first_lines = text_upper[:300]
-        for keyword in SUPPORTED_DOCUMENT_TYPES.keys():
-            if keyword in first_lines:
-                confidence += 0.4
-                break
+        if any(hit.position + len(hit.keyword) <= HEADER_LENGTH for hit in hits):
+            confidence += 0.4
 
         confidence = min(confidence, 0.99)
         confidence = round(confidence, 2)
 
+        return {
+            "classType": detected_type,
+            "confidence": confidence
+        }
+
+    def _log_classification(self, classification: Dict) -> None:
+        detected_type = classification["classType"]
+        confidence = classification["confidence"]
+
         logger.info(
             "DOCUMENT_CLASSIFIED",
             extra={
@@ -145,42 +167,80 @@ class DocumentClassificationPipeline:
                 extra={"severity": "medium"}
             )
 
-        return {
-            "classType": detected_type,
-            "confidence": confidence
-        }
+    def _statistical_classifier(self) -> Optional[StatisticalDocumentClassifier]:
+        if settings.document_classifier != "statistical":
+            return None
+        return load_classifier(settings.document_classifier_model_path)
+
+    def classify_document(self, text: str) -> Dict:
+        return self.classify_many([text])[0]
+
+    def classify_paged(self, doc: PagedText) -> Dict:
+        """classify_document for a PagedText, scanning its shared upper-cased view."""
+        classifier = self._statistical_classifier()
+        if classifier is not None:
+            classification = classifier.classify_many([doc.text])[0]
+        else:
+            classification = self._score(DOCUMENT_TYPE_REGISTRY.scan(doc.upper))
+
+        self._log_classification(classification)
+        return classification
+
+    def classify_many(self, texts: List[str]) -> List[Dict]:
+        """
+        Classify a batch of texts. With DOCUMENT_CLASSIFIER=statistical the
+        whole batch is scored by the NumPy model in one matrix multiply;
+        otherwise (or when the model cannot be loaded) the keyword rules run
+        per text.
+        """
+        classifier = self._statistical_classifier()
+        if classifier is not None:
+            classifications = classifier.classify_many(texts)
+        else:
+            classifications = [self._score(DOCUMENT_TYPE_REGISTRY.scan(text.upper())) for text in texts]
+
+        for classification in classifications:
+            self._log_classification(classification)
+        return classifications
+
+    def classify_pages(self, pages: Iterable[str], threshold: float) -> Tuple[Dict, List[str]]:
+        """
+        Classify page by page and stop pulling pages once the confidence
+        reaches `threshold` (after the header has been seen).
+
+        Returns the classification and the pages consumed; the caller can
+        chain them with the rest of a lazy iterator when it needs the full
+        text. Keywords never span lines and the earliest hit decides the
+        type, so stopping early gives the class type of classify_document;
+        only the confidence can be lower. Always uses the keyword rules.
+        """
+        consumed: List[str] = []
+        hits: List[KeywordHit] = []
+        offset = 0
+        classification = self._score(hits)
+
+        for page in pages:
+            consumed.append(page)
+            hits.extend(DOCUMENT_TYPE_REGISTRY.scan(page.upper(), offset=offset))
+            offset += len(page) + 1  # pages are joined with "\n"
+
+            classification = self._score(hits)
+            if classification["confidence"] >= threshold and offset >= HEADER_LENGTH:
+                break
+
+        self._log_classification(classification)
+        return classification, consumed
 
     # --------------------------------------------------
     # DATE EXTRACTION
     # --------------------------------------------------
-    def extract_date(self, text: str, label_patterns: list) -> Optional[str]:
-        for pattern in label_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                try:
-                    parsed_date = date_parser.parse(match.group(1), dayfirst=True)
-                    return parsed_date.date().isoformat()
-                except Exception:
-                    continue
-        return None
-
     # --------------------------------------------------
     # ISSUE / EXPIRY EXTRACTION
     # --------------------------------------------------
-    def extract_issue_and_expiry(self, text: str) -> Dict:
-        issue_patterns = [
-            r"ISSUE DATE:\s*(.+)",
-            r"DATE OF ISSUE:\s*(.+)",
-            r"REGISTRATION DATE:\s*(.+)"
-        ]
-
-        expiry_patterns = [
-            r"EXPIRY DATE:\s*(.+)",
-            r"DATE OF EXPIRY:\s*(.+)"
-        ]
-
-        issue_date = self.extract_date(text, issue_patterns)
-        expiry_date = self.extract_date(text, expiry_patterns)
+    def extract_issue_and_expiry(self, text: str, labels: Optional[LabelLookup] = None) -> Dict:
+        dates = extract_issue_and_expiry_dates(text, dayfirst=DAYFIRST, labels=labels)
+        issue_date = dates["issueDate"]
+        expiry_date = dates["expiryDate"]
 
         logger.info(
             "DOCUMENT_DATES_EXTRACTED",
@@ -213,43 +273,38 @@ class DocumentClassificationPipeline:
             "expiryDate": expiry_date
         }
 
-    # --------------------------------------------------
-    # MAIN PROCESSOR
-    # --------------------------------------------------
-    def process_document(self, file_path: str) -> Dict:
-        file_name = os.path.basename(file_path)
-
-        logger.info(
-            "DOCUMENT_PROCESSING_STARTED",
-            extra={
-                "file_name": mask_filename(file_name),
-                "processed_at": datetime.utcnow().isoformat()
-            }
-        )
-
-        text = self.extract_text(file_path)
-        classification = self.classify_document(text)
-        dates = self.extract_issue_and_expiry(text)
-        language = self.detect_language(text)
-
-        result = {
-            "fileName": file_name,
-            "classType": classification["classType"],
-            "issueDate": dates["issueDate"],
-            "expiryDate": dates["expiryDate"],
-            "confidence": classification["confidence"],
-            "language": language,
-            "processedAt": datetime.utcnow().isoformat()
-        }
-
-        logger.info(
-            "DOCUMENT_PROCESSING_COMPLETED",
-            extra={
-                "file_name": mask_filename(file_name),
-                "class_type": classification["classType"],
-                "confidence": classification["confidence"],
-                "language": language
-            }
-        )
 
-        return result
\ No newline at end of file
+# --------------------------------------------------
+# PROCESS POOL ENTRY POINT
+# --------------------------------------------------
+def classify_document_file(file_path: str, threshold: Optional[float] = None) -> Dict:
+    """
+    Classify a PDF from as few pages as needed (runs in a pool worker).
+
+    Only the pages read before the confidence reached `threshold` (default
+    settings.classification_early_exit_confidence) are extracted. Callers
+    that also need dates, language or the stored text must use
+    document_analyzer.analyze_document_file, which reads every page.
+    """
+    if threshold is None:
+        threshold = settings.classification_early_exit_confidence
+
+    pipeline = DocumentClassificationPipeline()
+    reader_pages = pipeline.iter_pages(file_path)
+    try:
+        classification, consumed = pipeline.classify_pages(reader_pages, threshold)
+    finally:
+        reader_pages.close()
+
+    logger.info(
+        "DOCUMENT_CLASSIFIED_FROM_PAGES | file=%s pages_read=%d",
+        mask_filename(os.path.basename(file_path)),
+        len(consumed),
+    )
+
+    return {
+        "fileName": os.path.basename(file_path),
+        "classType": classification["classType"],
+        "confidence": classification["confidence"],
+        "pagesRead": len(consumed),
+    }
@@ -0,0 +1,97 @@
+import re
+from typing import Dict, List, NamedTuple, Optional, Pattern
+
+
+class KeywordHit(NamedTuple):
+    position: int
+    keyword: str
+    doc_type: str
+
+
+class DocumentTypeRegistry:
+    """
+    Keyword -> document type registry with a single-pass matcher.
+
+    All keywords are compiled into one regex shaped like a trie of the
+    keywords, wrapped in a lookahead so overlapping hits are found. At each
+    text position the trie regex matches the longest registered keyword; the
+    shorter keywords matching at the same position are exactly its prefixes,
+    which come from a precomputed table. The per-position cost is bounded by
+    the keyword length rather than the number of keywords, so a scan stays
+    linear in the text however many types are registered.
+
+    Keywords are matched against upper-cased text and must not contain line
+    breaks (pages are scanned one at a time).
+    """
+
+    def __init__(self, types: Optional[Dict[str, str]] = None):
+        self._types: Dict[str, str] = {}
+        self._pattern: Optional[Pattern] = None
+        self._prefixes: Dict[str, List[str]] = {}
+        if types:
+            self.register_many(types)
+
+    def register(self, keyword: str, doc_type: str) -> None:
+        keyword = keyword.upper()
+        if not keyword or "\n" in keyword:
+            raise ValueError(f"Invalid document type keyword: {keyword!r}")
+        self._types[keyword] = doc_type
+        self._pattern = None  # recompiled on next scan
+
+    def register_many(self, types: Dict[str, str]) -> None:
+        for keyword, doc_type in types.items():
+            self.register(keyword, doc_type)
+
+    @property
+    def types(self) -> Dict[str, str]:
+        return dict(self._types)
+
+    def _compile(self) -> Pattern:
+        trie: Dict = {}
+        for keyword in self._types:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = True  # end of a keyword
+
+        def build(node: Dict) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+            # Greedy optional: the longer keyword wins, the shorter one is the fallback
+            return "(?:" + body + ")?" if "" in node else body
+
+        self._prefixes = {
+            keyword: sorted(
+                (other for other in self._types if other != keyword and keyword.startswith(other)),
+                key=len,
+                reverse=True,
+            )
+            for keyword in self._types
+        }
+        return re.compile("(?=(" + build(trie) + "))")
+
+    def scan(self, text_upper: str, offset: int = 0) -> List[KeywordHit]:
+        """
+        Every keyword occurrence in `text_upper`, ordered by position (longer
+        keywords first at the same position). `offset` is added to positions.
+        """
+        if not self._types:
+            return []
+        if self._pattern is None:
+            self._pattern = self._compile()
+
+        hits: List[KeywordHit] = []
+        for match in self._pattern.finditer(text_upper):
+            keyword = match.group(1)
+            position = match.start() + offset
+            hits.append(KeywordHit(position, keyword, self._types[keyword]))
+            for prefix in self._prefixes[keyword]:
+                hits.append(KeywordHit(position, prefix, self._types[prefix]))
+        return hits
+
+
+def first_hit(hits: List[KeywordHit]) -> Optional[KeywordHit]:
+    """The earliest hit; at equal positions the longest (most specific) keyword."""
+    return hits[0] if hits else None
@@ -1,241 +1,212 @@
-import os
 import re
-from typing import Dict, List, Optional
-from PyPDF2 import PdfReader
-from dateutil import parser as date_parser
-from datetime import datetime
-import json
+from typing import Callable, Dict, Iterable, NamedTuple, Pattern
+from app.services.kyb_pipeline.date_extraction import ALL_DATE_LABELS, DAYFIRST, parse_date
+from app.services.kyb_pipeline.label_index import AMOUNT_VALUE, TEXT_VALUE, LabelIndex
+from app.utils.paged_text import PagedText
 
 # =========================================================
 # Utility: Standard Field Builder (Traceable & Auditable)
 # =========================================================
 
-def build_field(value, source, confidence, method="regex_v1"):
+def build_field(value, source, confidence, method="regex_v1", page=None):
     return {
         "value": value,
         "sourceDocument": source,
+        "sourcePage": page,
         "confidence": round(confidence, 2),
         "extractionMethod": method
     }
 
+def new_unified_object() -> Dict:
+    return {
+        "companyProfile": {},
+        "licenseDetails": {},
+        "addresses": {},
+        "shareholders": [],
+        "ubos": [],
+        "documents": [],
+        "signatories": [],
+        "financialIndicators": {},
+        "riskAssessment": None,
+        "complianceIndicators": {"exceptions": []},
+        "missingFields": []
+    }
+
 # =========================================================
-# Document Processor
+# Field Rules ("LABEL: value" lines, read from one LabelIndex)
 # =========================================================
 
-class KYBExtractionPipeline:
-
-    SUPPORTED_TYPES = {
-        "TRADE LICENSE": "Trade License",
-        "MEMORANDUM OF ASSOCIATION": "MOA / AOA",
-        "BOARD RESOLUTION": "Board Resolution",
-        "PASSPORT": "ID",
-        "BANK": "Bank Letter",
-        "VAT REGISTRATION": "VAT / TRN",
-        "BALANCE SHEET": "Balance Sheet",
-        "PROFIT & LOSS": "Profit & Loss"
-    }
-
-    def __init__(self):
-        pass
+class FieldRule(NamedTuple):
+    label: str
+    confidence: float
+    value: Pattern = TEXT_VALUE
+    convert: Callable = str.strip
+
+
+def _amount(value: str) -> float:
+    # Remove commas and convert to float
+    return float(value.replace(",", ""))
+
+
+COMPANY_PROFILE_RULES = {
+    # Only non-license company info
+    "legalName": FieldRule("COMPANY NAME", 0.95),
+    "legalForm": FieldRule("LEGAL FORM", 0.95),
+}
+
+LICENSE_RULES = {
+    "registrationNumber": FieldRule("LICENSE NUMBER", 0.95),
+    "jurisdiction": FieldRule("JURISDICTION", 0.95),
+    "licenseIssuingAuthority": FieldRule("ISSUING AUTHORITY", 0.95),
+}
+
+# Parsed to ISO format if possible (0.95), else kept as written (0.8)
+LICENSE_DATE_LABELS = {
+    "issueDate": "ISSUE DATE",
+    "expiryDate": "EXPIRY DATE",
+}
+
+FINANCIAL_RULES = {
+    "revenue": FieldRule("REVENUE", 0.95, AMOUNT_VALUE, _amount),
+    "netProfit": FieldRule("NET PROFIT", 0.95, AMOUNT_VALUE, _amount),
+    "totalAssets": FieldRule("TOTAL ASSETS", 0.95, AMOUNT_VALUE, _amount),
+    "totalLiabilities": FieldRule("TOTAL LIABILITIES", 0.95, AMOUNT_VALUE, _amount),
+}
+
+# Financial fields read per document type; other types try all of them
+FINANCIAL_FIELDS_BY_TYPE = {
+    "Balance Sheet": ("totalAssets", "totalLiabilities"),
+    "Profit & Loss": ("revenue", "netProfit"),
+}
+
+AUDIT_RULES = {
+    "auditStatus": FieldRule("AUDIT STATUS", 0.9),
+}
+
+# Every label the field rules and the document dates read
+INDEXED_LABELS = tuple(dict.fromkeys([
+    *(rule.label for rules in (COMPANY_PROFILE_RULES, LICENSE_RULES, FINANCIAL_RULES, AUDIT_RULES)
+      for rule in rules.values()),
+    *LICENSE_DATE_LABELS.values(),
+    *ALL_DATE_LABELS,
+]))
+
+# Not "LABEL: value" lines: scanned separately
+SHAREHOLDER_PATTERN = re.compile(r"-\s*(.+?):\s*(\d+)%")
+SIGNATORY_PATTERN = re.compile(r"MR\.?\s*(.+?),\s*(CEO|CFO|DIRECTOR)")
+FINANCIAL_PERIOD_PATTERN = re.compile(r"FY\s*(\d{4})")
 
-    # -------------------------
-    # TEXT EXTRACTION
-    # -------------------------
+# =========================================================
+# Document Processor
+# =========================================================
 
-    def extract_text(self, file_path: str) -> str:
-        reader = PdfReader(file_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text.upper()
+class KYBExtractionPipeline:
+    """
+    Field extraction for KYB. Classification and document dates come from
+    the DocumentAnalyzer, which runs this pipeline as part of its single
+    pass over the text.
+    """
 
     # -------------------------
-    # CLASSIFICATION
+    # LABEL INDEX
     # -------------------------
 
-    def classify_document(self, text: str) -> Dict:
-        confidence = 0.0
-        doc_type = "Unsupported"
+    def index_labels(self, doc: PagedText) -> LabelIndex:
+        """One pass over the document for every label in INDEXED_LABELS."""
+        return LabelIndex(doc.upper, INDEXED_LABELS)
 
-        for keyword, dtype in self.SUPPORTED_TYPES.items():
-            if keyword in text:
-                doc_type = dtype
-                confidence += 0.6
-
-        if doc_type != "Unsupported":
-            confidence += 0.3
-
-        return {
-            "classType": doc_type,
-            "confidence": min(round(confidence, 2), 0.99)
-        }
+    def apply_rules(self, doc: PagedText, labels: LabelIndex, rules: Dict[str, FieldRule], file) -> Dict:
+        fields = {}
+        for field, rule in rules.items():
+            found = labels.find(rule.label, rule.value)
+            if found is not None:
+                fields[field] = build_field(
+                    rule.convert(found.value), file, rule.confidence, page=doc.page_of(found.offset)
+                )
+        return fields
 
     # -------------------------
-    # DATE EXTRACTION
+    # FIELD EXTRACTIONS
     # -------------------------
 
-    def extract_date(self, text: str, patterns: List[str]) -> Optional[str]:
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                try:
-                    return date_parser.parse(match.group(1)).date().isoformat()
-                except:
-                    continue
-        return None
-
-    def extract_issue_expiry(self, text: str):
-        issue_patterns = [
-            r"ISSUE DATE:\s*(.+)",
-            r"DATE OF ISSUE:\s*(.+)",
-            r"REGISTRATION DATE:\s*(.+)"
-        ]
-        expiry_patterns = [
-            r"EXPIRY DATE:\s*(.+)",
-            r"DATE OF EXPIRY:\s*(.+)"
-        ]
-
-        return {
-            "issueDate": self.extract_date(text, issue_patterns),
-            "expiryDate": self.extract_date(text, expiry_patterns)
-        }
+    def extract_company_profile(self, doc: PagedText, labels: LabelIndex, file):
+        return self.apply_rules(doc, labels, COMPANY_PROFILE_RULES, file)
 
-    # -------------------------
-    # FIELD EXTRACTIONS
-    # -------------------------
+    def extract_license_details(self, doc: PagedText, labels: LabelIndex, file):
+        license_info = self.apply_rules(doc, labels, LICENSE_RULES, file)
 
-    def extract_company_profile(self, text, file):
-        profile = {}
-        # Only non-license company info
-        patterns = {
-            "legalName": r"COMPANY NAME:\s*(.+)",
-            "legalForm": r"LEGAL FORM:\s*(.+)"
-        }
-
-        for field, pattern in patterns.items():
-            match = re.search(pattern, text)
-            if match:
-                profile[field] = build_field(match.group(1).strip(), file, 0.95)
-        return profile
-
-
-    def extract_license_details(self, text, file):
-        license_info = {}
-        patterns = {
-            "registrationNumber": r"LICENSE NUMBER:\s*(.+)",
-            "jurisdiction": r"JURISDICTION:\s*(.+)",
-            "licenseIssuingAuthority": r"ISSUING AUTHORITY:\s*(.+)",
-            "issueDate": r"ISSUE DATE:\s*(.+)",
-            "expiryDate": r"EXPIRY DATE:\s*(.+)"
-        }
-
-        for field, pattern in patterns.items():
-            match = re.search(pattern, text)
-            if match:
-                # For dates, parse to ISO format if possible
-                if "Date" in field:
-                    try:
-                        license_info[field] = build_field(date_parser.parse(match.group(1)).date().isoformat(), file, 0.95)
-                    except:
-                        license_info[field] = build_field(match.group(1).strip(), file, 0.8)
+        for field, label in LICENSE_DATE_LABELS.items():
+            found = labels.find(label)
+            if found is not None:
+                page = doc.page_of(found.offset)
+                parsed = parse_date(found.value, dayfirst=DAYFIRST)
+                if parsed is not None:
+                    license_info[field] = build_field(parsed, file, 0.95, page=page)
                 else:
-                    license_info[field] = build_field(match.group(1).strip(), file, 0.95)
+                    license_info[field] = build_field(found.value.strip(), file, 0.8, page=page)
         return license_info
 
-    def extract_shareholders(self, text, file):
+    def extract_shareholders(self, doc: PagedText, file):
         shareholders = []
-        matches = re.findall(r"-\s*(.+?):\s*(\d+)%", text)
-        for name, pct in matches:
+        for match in SHAREHOLDER_PATTERN.finditer(doc.upper):
+            name, pct = match.groups()
+            page = doc.page_of(match.start())
             shareholders.append({
-                "name": build_field(name.strip(), file, 0.9),
-                "ownershipPercentage": build_field(float(pct), file, 0.9),
-                "controlType": build_field("Direct", file, 0.8)
+                "name": build_field(name.strip(), file, 0.9, page=page),
+                "ownershipPercentage": build_field(float(pct), file, 0.9, page=page),
+                "controlType": build_field("Direct", file, 0.8, page=page)
             })
         return shareholders
 
-    def extract_signatories(self, text, file):
+    def extract_signatories(self, doc: PagedText, file):
         signatories = []
-        matches = re.findall(r"MR\.?\s*(.+?),\s*(CEO|CFO|DIRECTOR)", text)
-        for name, role in matches:
+        for match in SIGNATORY_PATTERN.finditer(doc.upper):
+            name, role = match.groups()
+            page = doc.page_of(match.start())
             signatories.append({
-                "name": build_field(name.strip(), file, 0.85),
-                "role": build_field(role.strip(), file, 0.85),
-                "authoritySource": build_field("Board Resolution", file, 0.8)
+                "name": build_field(name.strip(), file, 0.85, page=page),
+                "role": build_field(role.strip(), file, 0.85, page=page),
+                "authoritySource": build_field("Board Resolution", file, 0.8, page=page)
             })
         return signatories
 
-    def extract_financials(self, text, file, doc_type=None):
-        financials = {}
-        
-        if doc_type == "Balance Sheet":
-            patterns = {
-                "totalAssets": r"TOTAL ASSETS:\s*(-?[\d,]+)",
-                "totalLiabilities": r"TOTAL LIABILITIES:\s*(-?[\d,]+)"
-            }
-        elif doc_type == "Profit & Loss":
-            patterns = {
-                "revenue": r"REVENUE:\s*(-?[\d,]+)",
-                "netProfit": r"NET PROFIT:\s*(-?[\d,]+)"
-            }
-        else:
-            # fallback: try all numeric patterns
-            patterns = {
-                "revenue": r"REVENUE:\s*(-?[\d,]+)",
-                "netProfit": r"NET PROFIT:\s*(-?[\d,]+)",
-                "totalAssets": r"TOTAL ASSETS:\s*(-?[\d,]+)",
-                "totalLiabilities": r"TOTAL LIABILITIES:\s*(-?[\d,]+)"
-            }
-
-        for field, pattern in patterns.items():
-            match = re.search(pattern, text, flags=re.IGNORECASE)
-            if match:
-                # Remove commas and convert to float
-                value = float(match.group(1).replace(",", ""))
-                financials[field] = build_field(value, file, 0.95)
-        
+    def extract_financials(self, doc: PagedText, labels: LabelIndex, file, doc_type=None):
+        fields = FINANCIAL_FIELDS_BY_TYPE.get(doc_type, tuple(FINANCIAL_RULES))
+        financials = self.apply_rules(doc, labels, {field: FINANCIAL_RULES[field] for field in fields}, file)
+
         # Optional audit and FY period
-        audit = re.search(r"AUDIT STATUS:\s*(.+)", text)
-        if audit:
-            financials["auditStatus"] = build_field(audit.group(1).strip(), file, 0.9)
-        period = re.search(r"FY\s*(\d{4})", text)
+        financials.update(self.apply_rules(doc, labels, AUDIT_RULES, file))
+        period = FINANCIAL_PERIOD_PATTERN.search(doc.upper)
         if period:
-            financials["financialPeriod"] = build_field(period.group(1), file, 0.85)
+            financials["financialPeriod"] = build_field(period.group(1), file, 0.85, page=doc.page_of(period.start()))
 
         return financials
 
     # -------------------------
-    # SINGLE FILE UPDATE
+    # SINGLE DOCUMENT
     # -------------------------
 
-    def update_unified_object(self, unified: Dict, file_path: str) -> None:
-            file_name = os.path.basename(file_path)
-            text = self.extract_text(file_path)
-            classification = self.classify_document(text)
-            dates = self.extract_issue_expiry(text)
-
-            # Append document metadata
-            unified["documents"].append({
-                "fileName": file_name,
-                "classType": classification["classType"],
-                "confidence": classification["confidence"],
-                "issueDate": dates["issueDate"],
-                "expiryDate": dates["expiryDate"],
-                "processedAt": datetime.utcnow().isoformat()
-            })
+    def extract_partial(self, doc: PagedText, labels: LabelIndex, file_name: str, document: Dict) -> Dict:
+        """
+        All field extractions of one classified document, as a partial
+        unified object; `document` is its entry for unified["documents"]
+        and `labels` the document's index_labels().
+        """
+        partial = new_unified_object()
+        partial["documents"].append(document)
 
-            # Update companyProfile (non-license fields)
-            unified["companyProfile"].update(self.extract_company_profile(text, file_name))
+        # Update companyProfile (non-license fields)
+        partial["companyProfile"].update(self.extract_company_profile(doc, labels, file_name))
 
-            # Update license details separately
-            unified["licenseDetails"].update(self.extract_license_details(text, file_name))
+        # Update license details separately
+        partial["licenseDetails"].update(self.extract_license_details(doc, labels, file_name))
 
-            # Other extractions
-            unified["shareholders"].extend(self.extract_shareholders(text, file_name))
-            unified["signatories"].extend(self.extract_signatories(text, file_name))
-            financial_data = self.extract_financials(text, file_name, doc_type=classification["classType"])
-            unified["financialIndicators"].update(financial_data)
-            # Detect missing fields dynamically
-            self.detect_missing_fields(unified)
+        # Other extractions
+        partial["shareholders"].extend(self.extract_shareholders(doc, file_name))
+        partial["signatories"].extend(self.extract_signatories(doc, file_name))
+        financial_data = self.extract_financials(doc, labels, file_name, doc_type=document["classType"])
+        partial["financialIndicators"].update(financial_data)
+        return partial
 
     # -------------------------
     # MISSING FIELD DETECTION
@@ -254,3 +225,35 @@ class KYBExtractionPipeline:
         for field in required_financials:
             if field not in output["financialIndicators"]:
                 output["missingFields"].append(field)
+
+    # -------------------------
+    # MERGE PER-FILE RESULT
+    # -------------------------
+
+    def merge_unified_object(self, unified: Dict, partial: Dict) -> None:
+        """
+        Fold the result of a single-file extraction into the unified object
+        (the partial itself is not modified). Missing fields are not
+        updated; see reduce_partials.
+        """
+        unified["documents"].extend(partial["documents"])
+        unified["companyProfile"].update(partial["companyProfile"])
+        unified["licenseDetails"].update(partial["licenseDetails"])
+        unified["shareholders"].extend(partial["shareholders"])
+        unified["signatories"].extend(partial["signatories"])
+        unified["financialIndicators"].update(partial["financialIndicators"])
+
+
+def reduce_partials(partials: Iterable[Dict]) -> Dict:
+    """
+    Merge per-document partials into a new unified object, in the given
+    order: later documents win for single-valued fields, so callers pass a
+    stable order. Missing fields are detected once, at the end.
+    """
+    pipeline = KYBExtractionPipeline()
+    unified = new_unified_object()
+    for partial in partials:
+        pipeline.merge_unified_object(unified, partial)
+    pipeline.detect_missing_fields(unified)
+    return unified
+
@@ -0,0 +1,103 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Pattern, Tuple
+from app.services.kyb_pipeline.date_extraction import VALUE_PATTERN
+
+# Value readers, applied right after "LABEL:"
+TEXT_VALUE = VALUE_PATTERN  # rest of the line (after optional whitespace)
+AMOUNT_VALUE = re.compile(r"\s*(-?[\d,]+)")
+
+
+class LabelValue(NamedTuple):
+    value: str
+    offset: int  # offset of the label in the text
+
+
+@lru_cache(maxsize=None)
+def _compile(labels: Tuple[str, ...]) -> Tuple[Pattern, Dict[str, List[Tuple[str, int]]]]:
+    """
+    One alternation of every label (longest first) followed by ":", plus
+    for each label the shorter labels that end with it: the scan consumes
+    "LABEL:", so a suffix label ending at the same colon needs its own entry.
+    """
+    if any(":" in label for label in labels):
+        raise ValueError("labels must not contain ':'")
+
+    ordered = sorted(set(labels), key=len, reverse=True)
+    pattern = re.compile("(" + "|".join(map(re.escape, ordered)) + "):")
+    suffixes = {
+        label: [(other, len(label) - len(other)) for other in ordered if other != label and label.endswith(other)]
+        for label in ordered
+    }
+    return pattern, suffixes
+
+
+class LabelIndex:
+    """
+    Every "LABEL:" occurrence of a fixed set of labels, from one shared
+    scan that only advances as far as the lookups so far require.
+
+    `text` is the upper-cased document and `labels` are upper-case. Lookups
+    give the same result as re.search(LABEL + ":" + value_pattern): the
+    first occurrence whose value matches, where the value may start on the
+    next line. Only "LABEL:" is consumed, so labels inside the value of
+    another label are still found.
+    """
+
+    def __init__(self, text: str, labels: Iterable[str]):
+        self.text = text
+        pattern, self._suffixes = _compile(tuple(labels))
+        self._matches = pattern.finditer(text)
+        self._positions: Dict[str, List[Tuple[int, int]]] = {}  # label -> [(label offset, value start)]
+
+    def _advance(self) -> bool:
+        """Index the next label occurrence; False once the text is exhausted."""
+        if self._matches is None:
+            return False
+        match = next(self._matches, None)
+        if match is None:
+            self._matches = None
+            return False
+
+        label = match.group(1)
+        self._positions.setdefault(label, []).append((match.start(), match.end()))
+        for suffix, delta in self._suffixes[label]:
+            self._positions.setdefault(suffix, []).append((match.start() + delta, match.end()))
+        return True
+
+    def _occurrences(self, label: str) -> Iterator[Tuple[int, int]]:
+        """(label offset, value start) of every occurrence, scanning further only when needed."""
+        index = 0
+        while True:
+            positions = self._positions.get(label, ())
+            if index < len(positions):
+                yield positions[index]
+                index += 1
+            elif not self._advance():
+                return
+
+    def values(self, label: str, value: Pattern = TEXT_VALUE) -> List[LabelValue]:
+        """Every occurrence of `label` whose value matches `value`, in text order."""
+        found = []
+        for offset, start in self._occurrences(label):
+            match = value.match(self.text, start)
+            if match is not None:
+                found.append(LabelValue(match.group(1), offset))
+        return found
+
+    def find(self, label: str, value: Pattern = TEXT_VALUE) -> Optional[LabelValue]:
+        """First occurrence of `label` whose value matches `value`."""
+        for offset, start in self._occurrences(label):
+            match = value.match(self.text, start)
+            if match is not None:
+                return LabelValue(match.group(1), offset)
+        return None
+
+    # Same interface as date_extraction.DateLabelIndex
+    def get(self, label: str) -> Optional[str]:
+        found = self.find(label)
+        return found.value if found else None
+
+    def offset(self, label: str) -> Optional[int]:
+        found = self.find(label)
+        return found.offset if found else None
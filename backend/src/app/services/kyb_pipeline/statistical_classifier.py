@@ -0,0 +1,185 @@
+import re
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from app.core.logging import get_logger
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency: pip install ".[ml]"
+    np = None
+
+logger = get_logger(__name__)
+
+DEFAULT_MODEL_PATH = Path(__file__).parent / "models" / "document_classifier.npz"
+
+TOKEN_PATTERN = re.compile(r"[A-Z0-9&/]+")
+
+
+def _tokens(text: str) -> List[str]:
+    """Upper-cased word unigrams and bigrams."""
+    words = TOKEN_PATTERN.findall(text.upper())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class HashingVectorizer:
+    """
+    Stateless text -> vector transform: tokens are hashed (crc32, stable
+    across processes) into `n_features` signed buckets, then log-scaled and
+    L2-normalised. Nothing has to be stored besides `n_features`.
+    """
+
+    def __init__(self, n_features: int = 2 ** 14):
+        self.n_features = n_features
+
+    def transform(self, texts: Sequence[str]) -> "np.ndarray":
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            hashes = np.fromiter(
+                (zlib.crc32(token.encode("utf-8")) for token in _tokens(text)),
+                dtype=np.uint32,
+            )
+            if hashes.size == 0:
+                continue
+            indices = (hashes % self.n_features).astype(np.intp)
+            signs = np.where(hashes & 0x80000000, 1.0, -1.0).astype(np.float32)
+            np.add.at(matrix[row], indices, signs)
+
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class StatisticalDocumentClassifier:
+    """
+    Hashing vectorizer + multinomial logistic regression.
+
+    Documents whose best class probability stays below `min_confidence`
+    are reported as "Unsupported", matching the keyword classifier.
+    """
+
+    def __init__(
+        self,
+        classes: List[str],
+        weights: "np.ndarray",
+        bias: "np.ndarray",
+        n_features: int,
+        min_confidence: float = 0.5,
+    ):
+        self.classes = list(classes)
+        self.weights = weights.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        self.vectorizer = HashingVectorizer(n_features)
+        self.min_confidence = min_confidence
+
+    # -------------------------
+    # INFERENCE
+    # -------------------------
+    def predict_proba(self, texts: Sequence[str]) -> "np.ndarray":
+        """Class probabilities, one row per text (one matrix multiply per batch)."""
+        logits = self.vectorizer.transform(texts) @ self.weights.T + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def classify_many(self, texts: Sequence[str]) -> List[Dict]:
+        if not texts:
+            return []
+
+        results = []
+        for row in self.predict_proba(texts):
+            best = int(row.argmax())
+            probability = float(row[best])
+            results.append({
+                "classType": self.classes[best] if probability >= self.min_confidence else "Unsupported",
+                "confidence": round(min(probability, 0.99), 2),
+            })
+        return results
+
+    # -------------------------
+    # PERSISTENCE
+    # -------------------------
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            classes=np.array(self.classes),
+            weights=self.weights,
+            bias=self.bias,
+            n_features=np.array(self.vectorizer.n_features),
+            min_confidence=np.array(self.min_confidence),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "StatisticalDocumentClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                classes=[str(c) for c in data["classes"]],
+                weights=data["weights"],
+                bias=data["bias"],
+                n_features=int(data["n_features"]),
+                min_confidence=float(data["min_confidence"]),
+            )
+
+    # -------------------------
+    # TRAINING (offline, see scripts/train_document_classifier.py)
+    # -------------------------
+    @classmethod
+    def train(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        n_features: int = 2 ** 14,
+        epochs: int = 300,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+        min_confidence: float = 0.5,
+    ) -> "StatisticalDocumentClassifier":
+        """Full-batch gradient descent on the softmax cross-entropy."""
+        classes = sorted(set(labels))
+        targets = np.zeros((len(labels), len(classes)), dtype=np.float32)
+        targets[np.arange(len(labels)), [classes.index(label) for label in labels]] = 1.0
+
+        features = HashingVectorizer(n_features).transform(texts)
+        weights = np.zeros((len(classes), n_features), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+
+        for _ in range(epochs):
+            logits = features @ weights.T + bias
+            logits -= logits.max(axis=1, keepdims=True)
+            probabilities = np.exp(logits)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+            error = (probabilities - targets) / len(labels)
+            weights -= learning_rate * (error.T @ features + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+
+        return cls(classes, weights, bias, n_features, min_confidence)
+
+
+@lru_cache(maxsize=4)
+def load_classifier(path: Optional[str] = None) -> Optional[StatisticalDocumentClassifier]:
+    """
+    Load the model once per process. Returns None, after a warning, when
+    NumPy is not installed or the model file is missing, so callers can
+    fall back to the keyword rules.
+    """
+    model_path = Path(path) if path else DEFAULT_MODEL_PATH
+
+    if np is None:
+        logger.warning("STATISTICAL_CLASSIFIER_UNAVAILABLE | numpy is not installed")
+        return None
+    if not model_path.exists():
+        logger.warning("STATISTICAL_CLASSIFIER_UNAVAILABLE | model not found: %s", model_path)
+        return None
+
+    classifier = StatisticalDocumentClassifier.load(model_path)
+    logger.info(
+        "STATISTICAL_CLASSIFIER_LOADED | path=%s classes=%d features=%d",
+        model_path,
+        len(classifier.classes),
+        classifier.vectorizer.n_features,
+    )
+    return classifier
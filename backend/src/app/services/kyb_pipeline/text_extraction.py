@@ -0,0 +1,178 @@
+import importlib.util
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class TextExtractor(ABC):
+    """
+    PDF -> per-page text backend. Implementations import their library
+    lazily so optional backends cost nothing when they are not installed.
+    """
+
+    name: str = ""
+    module: str = ""  # import name used to check availability
+
+    @classmethod
+    def available(cls) -> bool:
+        return importlib.util.find_spec(cls.module) is not None
+
+    def iter_pages(self, file_path: str) -> Iterator[str]:
+        """Yield each page's text, extracting a page only when it is requested."""
+        return self.iter_page_range(file_path, 0, None)
+
+    @abstractmethod
+    def iter_page_range(self, file_path: str, start: int, stop: Optional[int]) -> Iterator[str]:
+        """iter_pages for the pages [start, stop) only (stop=None: to the end)."""
+
+    @abstractmethod
+    def page_count(self, file_path: str) -> int:
+        pass
+
+
+class PyPDF2TextExtractor(TextExtractor):
+    """Default backend (pure Python, always installed)."""
+
+    name = "pypdf2"
+    module = "PyPDF2"
+
+    def iter_page_range(self, file_path: str, start: int, stop: Optional[int]) -> Iterator[str]:
+        from PyPDF2 import PdfReader
+
+        pages = PdfReader(file_path).pages
+        for index in range(*slice(start, stop).indices(len(pages))):
+            yield pages[index].extract_text() or ""
+
+    def page_count(self, file_path: str) -> int:
+        from PyPDF2 import PdfReader
+
+        return len(PdfReader(file_path).pages)
+
+
+class PypdfTextExtractor(TextExtractor):
+    """pypdf, the maintained successor of PyPDF2 (pip install ".[pypdf]")."""
+
+    name = "pypdf"
+    module = "pypdf"
+
+    def iter_page_range(self, file_path: str, start: int, stop: Optional[int]) -> Iterator[str]:
+        from pypdf import PdfReader
+
+        pages = PdfReader(file_path).pages
+        for index in range(*slice(start, stop).indices(len(pages))):
+            yield pages[index].extract_text() or ""
+
+    def page_count(self, file_path: str) -> int:
+        from pypdf import PdfReader
+
+        return len(PdfReader(file_path).pages)
+
+
+class PdfminerTextExtractor(TextExtractor):
+    """pdfminer.six layout analysis (pip install ".[pdfminer]")."""
+
+    name = "pdfminer"
+    module = "pdfminer"
+
+    def iter_page_range(self, file_path: str, start: int, stop: Optional[int]) -> Iterator[str]:
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+
+        page_numbers = None if start == 0 and stop is None else range(start, stop or self.page_count(file_path))
+        for layout in extract_pages(file_path, page_numbers=page_numbers):
+            yield "".join(
+                element.get_text() for element in layout if isinstance(element, LTTextContainer)
+            ).rstrip("\n")
+
+    def page_count(self, file_path: str) -> int:
+        from pdfminer.pdfpage import PDFPage
+
+        with open(file_path, "rb") as fp:
+            return sum(1 for _ in PDFPage.get_pages(fp))
+
+
+class Pypdfium2TextExtractor(TextExtractor):
+    """PDFium bindings, native and the fastest option (pip install ".[pdfium]")."""
+
+    name = "pypdfium2"
+    module = "pypdfium2"
+
+    def iter_page_range(self, file_path: str, start: int, stop: Optional[int]) -> Iterator[str]:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            for index in range(*slice(start, stop).indices(len(pdf))):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                try:
+                    # PDFium uses CRLF line breaks; the pipelines expect "\n"
+                    yield textpage.get_text_range().replace("\r\n", "\n").replace("\r", "\n")
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+
+    def page_count(self, file_path: str) -> int:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+
+TEXT_EXTRACTORS: Dict[str, Type[TextExtractor]] = {
+    extractor.name: extractor
+    for extractor in (PyPDF2TextExtractor, PypdfTextExtractor, PdfminerTextExtractor, Pypdfium2TextExtractor)
+}
+
+
+@lru_cache(maxsize=None)
+def get_text_extractor(name: Optional[str] = None) -> TextExtractor:
+    """
+    Backend named `name` (default settings.pdf_text_extractor). Unknown or
+    uninstalled backends fall back to PyPDF2 with a warning.
+    """
+    name = (name or settings.pdf_text_extractor).lower()
+    extractor = TEXT_EXTRACTORS.get(name)
+
+    if extractor is None:
+        logger.warning("PDF_TEXT_EXTRACTOR_UNKNOWN | %s, using pypdf2", name)
+        extractor = PyPDF2TextExtractor
+    elif not extractor.available():
+        logger.warning("PDF_TEXT_EXTRACTOR_UNAVAILABLE | %s is not installed, using pypdf2", name)
+        extractor = PyPDF2TextExtractor
+
+    return extractor()
+
+
+# --------------------------------------------------
+# PROCESS POOL ENTRY POINTS (page-range parallel extraction)
+# --------------------------------------------------
+def count_pages(file_path: str) -> int:
+    return get_text_extractor().page_count(file_path)
+
+
+def extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """Text of the pages [start, stop); one range of a parallel extraction."""
+    return list(get_text_extractor().iter_page_range(file_path, start, stop))
+
+
+def split_page_ranges(page_count: int, parts: int) -> List[Tuple[int, int]]:
+    """[start, stop) ranges covering every page in order, in at most `parts` near-equal pieces."""
+    parts = max(1, min(parts, page_count))
+    size, extra = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        stop = start + size + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
@@ -1,5 +1,15 @@
+import hashlib
 import magic
 
+def sha256_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 hex digest of a file, read in chunks."""
+    hasher = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
 def detect_file_type(file_path: str) -> str:
     """
     Detect common file types using python-magic
@@ -0,0 +1,56 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from langdetect import detect, DetectorFactory
+from langdetect.detector_factory import init_factory
+
+# Ensure consistent results
+DetectorFactory.seed = 0
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+_CACHE_SIZE = 1024
+
+
+def warm_up_language_profiles() -> None:
+    """
+    Load the langdetect profiles now instead of on the first detect() call.
+    Called at app startup and in every analysis pool worker; the lazy load
+    is also not safe to race from several threads.
+    """
+    init_factory()
+
+
+def language_sample(text: str, max_chars: int, windows: int = 4) -> str:
+    """
+    Deterministic bounded sample of `text`: `windows` evenly spaced slices
+    (first one at the start, last one at the end) totalling `max_chars`.
+    """
+    if len(text) <= max_chars:
+        return text
+
+    width = max_chars // windows
+    step = (len(text) - width) / (windows - 1)
+    return "\n".join(text[round(i * step):round(i * step) + width] for i in range(windows))
+
+
+def detect_language_sample(text: str, max_chars: int) -> str:
+    """
+    langdetect on a bounded sample of `text`, memoized by the sample's hash.
+    Raises langdetect's LangDetectException like detect() does.
+    """
+    sample = language_sample(text, max_chars)
+    key = hashlib.sha1(sample.encode("utf-8")).hexdigest()
+
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    language = detect(sample)
+
+    with _cache_lock:
+        _cache[key] = language
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return language
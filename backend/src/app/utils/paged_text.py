@@ -0,0 +1,44 @@
+from bisect import bisect_right
+from functools import cached_property
+from itertools import accumulate
+from typing import Iterable, List
+
+
+class PagedText:
+    """
+    Document text that keeps its page boundaries.
+
+    Built from a page iterator (consumed once). `text` is the pages joined
+    exactly like app.utils.text_compression.join_pages, and `upper` its
+    upper-cased view; both are built on first use and then shared, so every
+    regex of a pipeline runs on the same string without further copies.
+    `page_of` maps a match offset back to its 1-based page number.
+    """
+
+    def __init__(self, pages: Iterable[str]):
+        self.pages: List[str] = list(pages)
+        # Start offset of every page in `text` (each page is followed by "\n")
+        self.offsets: List[int] = [0, *accumulate(len(page) + 1 for page in self.pages)][:-1]
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    @cached_property
+    def text(self) -> str:
+        return "".join(page + "\n" for page in self.pages)
+
+    @cached_property
+    def upper(self) -> str:
+        return self.text.upper()
+
+    @cached_property
+    def _upper_offsets(self) -> List[int]:
+        # str.upper() can lengthen some characters ("ß" -> "SS")
+        if len(self.upper) == len(self.text):
+            return self.offsets
+        return [0, *accumulate(len(page.upper()) + 1 for page in self.pages)][:-1]
+
+    def page_of(self, offset: int, upper: bool = True) -> int:
+        """1-based page containing `offset` of `upper` (or of `text` with upper=False)."""
+        offsets = self._upper_offsets if upper else self.offsets
+        return max(bisect_right(offsets, offset), 1)
@@ -0,0 +1,21 @@
+import json
+import zlib
+from typing import Iterable, List
+
+# Bump when the stored format changes so old rows can be told apart
+TEXT_ENCODING = "zlib+json/v1"
+
+
+def join_pages(pages: Iterable[str]) -> str:
+    """Full document text exactly as the pipelines build it: one newline after each page."""
+    return "".join(page + "\n" for page in pages)
+
+
+def compress_pages(pages: List[str]) -> bytes:
+    """Compress per-page document text for storage."""
+    return zlib.compress(json.dumps(pages, ensure_ascii=False).encode("utf-8"), 6)
+
+
+def decompress_pages(data: bytes) -> List[str]:
+    """Inverse of compress_pages."""
+    return json.loads(zlib.decompress(data).decode("utf-8"))
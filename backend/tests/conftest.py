@@ -0,0 +1,45 @@
+import os
+
+# Settings needs these; tests never reach a real database or storage account
+for name, value in {
+    "SECRET_KEY": "test-secret",
+    "ALGORITHM": "HS256",
+    "DATABASE_URL": "sqlite://",
+    "DATABASE_URL_ASYNC": "sqlite+aiosqlite://",
+    "AZURE_STORAGE_BLOB_CONNECTION_STRING": "UseDevelopmentStorage=true",
+    "AZURE_STORAGE_CONTAINER": "test",
+    "LOG_TO_FILE": "false",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+import pytest  # noqa: E402
+
+# Synthetic documents: two trade licenses disagree on single-valued fields,
+# so the merge order decides the result
+SAMPLE_DOCUMENT_PAGES = {
+    "license_2023.pdf": [
+        "TRADE LICENSE\nCOMPANY NAME: ACME TRADING LLC\nLICENSE NUMBER: TL-1001\n"
+        "JURISDICTION: DUBAI\nISSUE DATE: 01-02-2023\nEXPIRY DATE: 01-02-2024\n",
+    ],
+    "license_2024.pdf": [
+        "TRADE LICENSE\nCOMPANY NAME: ACME GLOBAL TRADING LLC\nLICENSE NUMBER: TL-2002\n"
+        "LEGAL FORM: LLC\nISSUE DATE: 01-02-2024\nEXPIRY DATE: 01-02-2030\n",
+    ],
+    "balance_sheet.pdf": ["BALANCE SHEET FY 2024\nTOTAL ASSETS: 1,500,000\n", "TOTAL LIABILITIES: 400,000\n"],
+    "profit_loss.pdf": ["PROFIT & LOSS FY 2024\nREVENUE: 900,000\nNET PROFIT: 120,000\n"],
+    "board_resolution.pdf": [
+        "BOARD RESOLUTION\nSHAREHOLDERS:\n- JOHN SMITH: 60%\n- JANE DOE: 40%\nSIGNED BY MR. JOHN SMITH, DIRECTOR\n",
+    ],
+}
+
+
+@pytest.fixture(scope="session")
+def sample_partials():
+    """KYB partial of every SAMPLE_DOCUMENT_PAGES document, by file name."""
+    from app.services.kyb_pipeline.document_analyzer import analyze_document_pages
+
+    return {
+        file_name: analyze_document_pages(file_name, pages)["kyb"]
+        for file_name, pages in SAMPLE_DOCUMENT_PAGES.items()
+    }
@@ -0,0 +1,71 @@
+import random
+import re
+
+import pytest
+from dateutil import parser as date_parser
+
+from app.services.kyb_pipeline.date_extraction import _fast_parse, extract_issue_and_expiry_dates, parse_date
+
+MONTH_NAMES = ["Jan", "January", "SEPT", "sept", "Sep", "May", "Foo", "Mar", "MARCH"]
+
+
+def _dateutil(value: str, dayfirst: bool):
+    try:
+        return date_parser.parse(value, dayfirst=dayfirst).date()
+    except Exception:
+        return None
+
+
+def _sample_values():
+    values = []
+    for a in range(0, 33):
+        for b in range(0, 33):
+            for sep in "-/.":
+                values += [f"{a}{sep}{b}{sep}2024", f"{a:02d}{sep}{b:02d}{sep}2024", f"2024{sep}{a}{sep}{b}", f"2024{sep}{a:02d}{sep}{b:02d}"]
+        for month in MONTH_NAMES:
+            values += [
+                f"{a} {month} 2024", f"{a}-{month}-2024", f"{a} {month}, 2024", f"{month} {a}, 2024",
+                f"{month} {a} 2024", f"{a}  {month}  2024", f"{a}-{month} 2024",
+            ]
+    return values
+
+
+@pytest.mark.parametrize("dayfirst", [True, False])
+def test_fast_parse_agrees_with_dateutil(dayfirst):
+    fast_hits = 0
+    for value in _sample_values():
+        fast = _fast_parse(value, dayfirst)
+        if fast is not None:
+            fast_hits += 1
+            assert fast == _dateutil(value, dayfirst), value
+        expected = _dateutil(value, dayfirst)
+        assert parse_date(value, dayfirst) == (expected.isoformat() if expected else None), value
+
+    assert fast_hits > 1000  # the fast path covers the common formats
+
+
+@pytest.mark.parametrize("dayfirst", [True, False])
+def test_label_dates_match_per_label_regexes(dayfirst):
+    issue_patterns = [r"ISSUE DATE:\s*(.+)", r"DATE OF ISSUE:\s*(.+)", r"REGISTRATION DATE:\s*(.+)"]
+    expiry_patterns = [r"EXPIRY DATE:\s*(.+)", r"DATE OF EXPIRY:\s*(.+)"]
+
+    def first_date(text, patterns):
+        for pattern in patterns:
+            match = re.search(pattern, text)
+            if match:
+                parsed = _dateutil(match.group(1), dayfirst)
+                if parsed:
+                    return parsed.isoformat()
+        return None
+
+    fragments = [
+        "ISSUE DATE: ", "ISSUE DATE:", "DATE OF ISSUE: ", "REGISTRATION DATE: ", "EXPIRY DATE: ",
+        "DATE OF EXPIRY:", "\n", "01-JAN-2024", " 2025-02-03", "GARBAGE", "12/11/2023 ", "X", "ISSUE DATE:\n",
+    ]
+    rng = random.Random(3)
+    for _ in range(3000):
+        text = "".join(rng.choice(fragments) for _ in range(rng.randint(1, 10)))
+        assert extract_issue_and_expiry_dates(text, dayfirst) == {
+            "issueDate": first_date(text, issue_patterns),
+            "expiryDate": first_date(text, expiry_patterns),
+        }, text
@@ -0,0 +1,65 @@
+import random
+import re
+
+import pytest
+
+from app.services.kyb_pipeline.document_classification_pipeline import SUPPORTED_DOCUMENT_TYPES
+from app.services.kyb_pipeline.document_type_registry import DocumentTypeRegistry, first_hit
+
+SYNTHETIC_KEYWORDS = ["AB", "ABC", "ABCD", "BC", "B", "CAB", "X Y", "Q&R"]
+
+
+def _earliest_by_regex(types, text):
+    """What the registry replaces: one re.search per keyword, earliest (then longest) wins."""
+    found = [
+        (match.start(), -len(keyword), keyword)
+        for keyword in types
+        if (match := re.search(re.escape(keyword), text))
+    ]
+    return min(found)[2] if found else None
+
+
+def _texts(rng, alphabet, words, count):
+    for _ in range(count):
+        yield "".join(rng.choice(alphabet + words) for _ in range(rng.randint(0, 30)))
+
+
+@pytest.mark.parametrize("types, alphabet", [
+    ({keyword: keyword.lower() for keyword in SYNTHETIC_KEYWORDS}, list("ABCDXY Q&R")),
+    (SUPPORTED_DOCUMENT_TYPES, list(" \nAEK")),
+], ids=["overlapping", "supported"])
+def test_scan_picks_the_earliest_keyword_like_per_keyword_regexes(types, alphabet):
+    registry = DocumentTypeRegistry(types)
+    rng = random.Random(1)
+    for text in _texts(rng, alphabet, list(types), 3000):
+        hit = first_hit(registry.scan(text))
+        expected = _earliest_by_regex(types, text)
+        assert (hit.keyword if hit else None) == expected, text
+        if hit:
+            assert hit.doc_type == types[expected]
+
+
+def test_scan_finds_every_overlapping_occurrence():
+    registry = DocumentTypeRegistry({keyword: keyword.lower() for keyword in SYNTHETIC_KEYWORDS})
+    rng = random.Random(2)
+    for text in _texts(rng, list("ABCDXY Q&R"), [], 3000):
+        expected = sorted(
+            (match.start(), keyword)
+            for keyword in SYNTHETIC_KEYWORDS
+            for match in re.finditer("(?=" + re.escape(keyword) + ")", text)
+        )
+        assert sorted((hit.position, hit.keyword) for hit in registry.scan(text)) == expected, text
+
+
+def test_scan_offset_and_registration():
+    registry = DocumentTypeRegistry()
+    assert registry.scan("BANK") == []
+
+    registry.register("bank", "Bank Letter")
+    registry.register("BANK STATEMENT", "Bank Statement")
+    hits = registry.scan("MY BANK STATEMENT", offset=100)
+    assert [(hit.position, hit.keyword) for hit in hits] == [(103, "BANK STATEMENT"), (103, "BANK")]
+    assert first_hit(hits).doc_type == "Bank Statement"
+
+    with pytest.raises(ValueError):
+        registry.register("TWO\nLINES", "X")
@@ -0,0 +1,125 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import kyb_generation_service
+from app.services.kyb_generation_service import KYBGenerationService
+
+COMPANY_ID = "company-1"
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """A service over a fixed document set whose generation runs until `release` is set."""
+
+    @asynccontextmanager
+    async def no_session():
+        yield None
+
+    monkeypatch.setattr(kyb_generation_service, "AsyncSessionLocal", no_session)
+
+    service = KYBGenerationService()
+    service.documents = [
+        SimpleNamespace(id="doc-1", content_hash="hash-1", filename="license.pdf", upload_time=datetime(2024, 5, 1)),
+    ]
+    service.runs = 0
+
+    async def get_documents_by_company(db, company_id):
+        return list(service.documents)
+
+    async def generate(db, company_id, documents, blob_service, emit):
+        service.runs += 1
+        run = service.runs
+        await service.release.wait()
+        return {"status": "success", "run": run, "unified_company": {"documents": [doc.id for doc in documents]}}
+
+    service.document_service.get_documents_by_company = get_documents_by_company
+    service._generate = generate
+    return service
+
+
+async def _settle():
+    """Let started tasks run up to their next real wait."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def _run(service, scenario):
+    async def main():
+        service.release = asyncio.Event()  # bound to this test's event loop
+        await scenario()
+
+    asyncio.run(main())
+
+
+def test_concurrent_calls_share_one_run(service):
+    async def scenario():
+        calls = [asyncio.create_task(service.process(None, COMPANY_ID, None)) for _ in range(5)]
+        await _settle()
+        service.release.set()
+        results = await asyncio.gather(*calls)
+
+        assert service.runs == 1
+        assert all(result == results[0] for result in results)
+        assert len({id(result) for result in results}) == 5  # every caller gets its own copy
+        assert service._in_flight == {}
+
+        # Finished result is cached for the unchanged document set
+        assert await service.process(None, COMPANY_ID, None) == results[0]
+        assert service.runs == 1
+
+        # A changed document set starts a new run
+        service.documents.append(
+            SimpleNamespace(id="doc-2", content_hash="hash-2", filename="bs.pdf", upload_time=datetime(2024, 5, 2))
+        )
+        result = await service.process(None, COMPANY_ID, None)
+        assert service.runs == 2
+        assert result["unified_company"]["documents"] == ["doc-1", "doc-2"]
+
+    _run(service, scenario)
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_run(service):
+    async def scenario():
+        leader = asyncio.create_task(service.process(None, COMPANY_ID, None))
+        await _settle()
+        follower = asyncio.create_task(service.process(None, COMPANY_ID, None))
+        await _settle()
+
+        leader.cancel()
+        service.release.set()
+        result = await follower
+
+        assert leader.cancelled()
+        assert result["status"] == "success"
+        assert service.runs == 1
+
+    _run(service, scenario)
+
+
+def test_invalidate_drops_the_in_flight_run_and_the_cached_result(service):
+    async def scenario():
+        before = asyncio.create_task(service.process(None, COMPANY_ID, None))
+        await _settle()
+
+        # e.g. a manual edit while generating: later callers must not join the old run
+        service.invalidate(COMPANY_ID)
+        after = asyncio.create_task(service.process(None, COMPANY_ID, None))
+        await _settle()
+        assert service.runs == 2
+
+        service.release.set()
+        assert (await before)["run"] == 1  # still answered
+        assert (await after)["run"] == 2
+
+        # Only the run started after invalidate() was cached
+        assert (await service.process(None, COMPANY_ID, None))["run"] == 2
+        assert service.runs == 2
+
+        service.invalidate(COMPANY_ID)
+        assert (await service.process(None, COMPANY_ID, None))["run"] == 3
+
+    _run(service, scenario)
@@ -0,0 +1,70 @@
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.services.kyb_generation_service import build_ledger, ledger_partials, merge_order
+from app.services.kyb_pipeline.kyb_extraction_piepline import reduce_partials
+
+
+def _documents(sample_partials):
+    started = datetime(2024, 5, 1, 9, 0)
+    return [
+        SimpleNamespace(
+            id=f"doc-{i}",
+            content_hash=f"hash-{file_name}",
+            filename=file_name,
+            upload_time=started + timedelta(minutes=i),
+        )
+        for i, file_name in enumerate(sample_partials)
+    ]
+
+
+def _merge(documents, partials):
+    return reduce_partials(partials[doc.id] for doc in sorted(documents, key=merge_order))
+
+
+def test_unchanged_documents_are_reused_from_the_ledger(sample_partials):
+    documents = _documents(sample_partials)
+    partials = {doc.id: sample_partials[doc.filename] for doc in documents}
+    ledger = json.loads(json.dumps(build_ledger(documents, partials)))  # as stored in the JSONB column
+
+    assert ledger_partials(ledger, documents) == partials
+
+
+def test_deleted_document_is_retracted(sample_partials):
+    documents = _documents(sample_partials)
+    partials = {doc.id: sample_partials[doc.filename] for doc in documents}
+    ledger = build_ledger(documents, partials)
+
+    remaining = [doc for doc in documents if doc.filename != "license_2024.pdf"]
+    reused = ledger_partials(ledger, remaining)
+
+    assert set(reused) == {doc.id for doc in remaining}
+    unified = _merge(remaining, reused)
+    assert unified == _merge(remaining, {doc.id: sample_partials[doc.filename] for doc in remaining})
+    # Its fields are gone, the older license's come back
+    assert "license_2024.pdf" not in [entry["fileName"] for entry in unified["documents"]]
+    assert unified["companyProfile"]["legalName"]["value"] == "ACME TRADING LLC"
+    assert "legalForm" not in unified["companyProfile"]
+
+    assert set(build_ledger(remaining, reused)["documents"]) == {doc.id for doc in remaining}
+
+
+def test_replaced_or_renamed_documents_are_analyzed_again(sample_partials):
+    documents = _documents(sample_partials)
+    ledger = build_ledger(documents, {doc.id: sample_partials[doc.filename] for doc in documents})
+
+    documents[0].content_hash = "hash-of-new-content"
+    documents[1].filename = "renamed.pdf"
+    added = SimpleNamespace(id="doc-new", content_hash="hash-new", filename="new.pdf", upload_time=datetime(2024, 6, 1))
+
+    reused = ledger_partials(ledger, documents + [added])
+    assert set(reused) == {doc.id for doc in documents[2:]}
+
+
+def test_ledger_of_another_pipeline_version_is_ignored(sample_partials):
+    documents = _documents(sample_partials)
+    ledger = build_ledger(documents, {doc.id: sample_partials[doc.filename] for doc in documents})
+
+    assert ledger_partials({**ledger, "version": "older-rules"}, documents) == {}
+    assert ledger_partials(None, documents) == {}
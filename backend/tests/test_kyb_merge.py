@@ -0,0 +1,62 @@
+import copy
+import random
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.services.kyb_generation_service import merge_order
+from app.services.kyb_pipeline.kyb_extraction_piepline import KYBExtractionPipeline, new_unified_object, reduce_partials
+
+
+def _documents(sample_partials):
+    """Stand-ins for Document rows; the two licenses share an upload time, so the id decides."""
+    uploads = {
+        "license_2023.pdf": ("doc-b", datetime(2024, 5, 1, 9, 0)),
+        "license_2024.pdf": ("doc-c", datetime(2024, 5, 1, 9, 0)),
+        "balance_sheet.pdf": ("doc-a", datetime(2024, 5, 2, 9, 0)),
+        "profit_loss.pdf": ("doc-e", datetime(2024, 4, 30, 9, 0)),
+        "board_resolution.pdf": ("doc-d", datetime(2024, 5, 3, 9, 0)),
+    }
+    return [
+        SimpleNamespace(id=doc_id, upload_time=upload_time, filename=file_name, partial=sample_partials[file_name])
+        for file_name, (doc_id, upload_time) in uploads.items()
+    ]
+
+
+def test_merge_is_independent_of_the_order_partials_arrive_in(sample_partials):
+    documents = _documents(sample_partials)
+    expected = reduce_partials(doc.partial for doc in sorted(documents, key=merge_order))
+
+    rng = random.Random(0)
+    for _ in range(30):
+        arrived = documents[:]
+        rng.shuffle(arrived)  # e.g. the completion order of parallel analyses
+        assert reduce_partials(doc.partial for doc in sorted(arrived, key=merge_order)) == expected
+
+    # The later upload (same time, greater id) wins single-valued fields
+    assert expected["companyProfile"]["legalName"]["value"] == "ACME GLOBAL TRADING LLC"
+    assert expected["licenseDetails"]["registrationNumber"]["value"] == "TL-2002"
+    assert [doc["fileName"] for doc in expected["documents"]] == [
+        "profit_loss.pdf", "license_2023.pdf", "license_2024.pdf", "balance_sheet.pdf", "board_resolution.pdf",
+    ]
+
+
+def test_reduce_matches_the_sequential_merge(sample_partials):
+    ordered = [doc.partial for doc in sorted(_documents(sample_partials), key=merge_order)]
+    before = copy.deepcopy(ordered)
+
+    pipeline = KYBExtractionPipeline()
+    sequential = new_unified_object()
+    for partial in ordered:
+        pipeline.merge_unified_object(sequential, partial)
+        pipeline.detect_missing_fields(sequential)
+
+    assert reduce_partials(ordered) == sequential
+    assert ordered == before  # partials are not modified, so they can be cached and merged again
+
+
+def test_missing_fields_are_detected_once_at_the_end(sample_partials):
+    unified = reduce_partials([sample_partials["profit_loss.pdf"]])
+    assert unified["missingFields"] == ["legalName", "registrationNumber", "jurisdiction", "totalAssets", "totalLiabilities"]
+    assert reduce_partials([])["missingFields"] == [
+        "legalName", "registrationNumber", "jurisdiction", "totalAssets", "totalLiabilities", "revenue", "netProfit",
+    ]
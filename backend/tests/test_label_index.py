@@ -0,0 +1,69 @@
+import random
+import re
+
+import pytest
+
+from app.services.kyb_pipeline.kyb_extraction_piepline import INDEXED_LABELS
+from app.services.kyb_pipeline.label_index import AMOUNT_VALUE, TEXT_VALUE, LabelIndex
+
+VALUES = ["ACME LLC", "1,234", "-5,000", "12/03/2024", "01-JAN-2024", "", " ", "X", "FY 2023", "ABC"]
+SEPARATORS = ["", " ", "  ", "\n", " \n "]
+
+
+def _search(text, label, value):
+    """What LabelIndex replaces: one re.search per label."""
+    match = re.search(re.escape(label) + ":" + value.pattern, text)
+    return (match.group(1), match.start()) if match else None
+
+
+def _random_text(rng, labels):
+    parts = []
+    for _ in range(rng.randint(0, 12)):
+        if rng.random() < 0.7:
+            parts.append(rng.choice(labels) + ":" + rng.choice(SEPARATORS) + rng.choice(VALUES + labels))
+        else:
+            parts.append(rng.choice(VALUES))
+        parts.append(rng.choice(["\n", " ", "", "\n\n"]))
+    return "".join(parts)
+
+
+@pytest.mark.parametrize("value", [TEXT_VALUE, AMOUNT_VALUE], ids=["text", "amount"])
+def test_find_matches_re_search_for_the_kyb_labels(value):
+    labels = list(INDEXED_LABELS)
+    rng = random.Random(1)
+    for _ in range(2000):
+        text = _random_text(rng, labels)
+        index = LabelIndex(text, labels)
+        for label in rng.sample(labels, 8):  # lookups in any order share the one scan
+            found = index.find(label, value)
+            assert (tuple(found) if found else None) == _search(text, label, value), (text, label)
+
+
+def test_labels_ending_with_another_label():
+    labels = ["NAME", "COMPANY NAME", "FULL COMPANY NAME", "DATE"]
+    fragments = ["COMPANY NAME:", "NAME:", "FULL COMPANY NAME:", " X ", "\n", "DATE: 1", "Y"]
+    rng = random.Random(2)
+    for _ in range(3000):
+        text = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 10)))
+        index = LabelIndex(text, labels)
+        for label in labels:
+            found = index.find(label)
+            assert (tuple(found) if found else None) == _search(text, label, TEXT_VALUE), (text, label)
+            assert index.get(label) == (found.value if found else None)
+
+
+def test_values_lists_every_occurrence_in_text_order():
+    text = "NAME: A\nCOMPANY NAME: B\nNAME:\nC\nNAME:"
+    index = LabelIndex(text, ["NAME", "COMPANY NAME"])
+    expected = [
+        (match.group(1), match.start())
+        for start in (m.start() for m in re.finditer("(?=NAME:)", text))
+        if (match := re.compile(r"NAME:\s*(.+)").match(text, start))
+    ]
+    assert [tuple(found) for found in index.values("NAME")] == expected
+    assert [found.value for found in index.values("NAME")] == ["A", "B", "C"]
+
+
+def test_labels_with_a_colon_are_rejected():
+    with pytest.raises(ValueError):
+        LabelIndex("", ["A:B"])
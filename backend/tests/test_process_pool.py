@@ -0,0 +1,27 @@
+import asyncio
+import os
+import signal
+
+from app.core import process_pool
+from app.core.config import settings
+
+
+def test_pool_recovers_after_a_worker_is_killed(monkeypatch):
+    monkeypatch.setattr(settings, "analysis_pool_workers", 1)
+
+    async def scenario():
+        process_pool.start_process_pool()
+        try:
+            first_pid = await process_pool.run_in_process_pool(os.getpid)
+            assert first_pid != os.getpid()
+
+            os.kill(first_pid, signal.SIGKILL)
+
+            # The dead worker broke the pool; the call lands on a fresh one
+            second_pid = await process_pool.run_in_process_pool(os.getpid)
+            assert second_pid not in (first_pid, os.getpid())
+            assert await process_pool.run_in_process_pool(sum, [1, 2, 3]) == 6
+        finally:
+            process_pool.shutdown_process_pool()
+
+    asyncio.run(scenario())